@@ -1,7 +1,29 @@
 from .bio_crypt import BioCrypt
-from .biometric_vision import RealFingerprintExtractor
 from .biometric_core import Fingerprint
+from .template_cache import TemplateCache
+from .enrollment_store import EnrollmentStore
+from .record_format import pack_record, pack_records, unpack_record, unpack_records, RECORD_DTYPE
+from typing import Iterable, Iterator, List, Tuple, TYPE_CHECKING
 import os
+import threading
+import time
+
+if TYPE_CHECKING:
+    from .biometric_vision import RealFingerprintExtractor, ImageInput
+    from .aio import AsyncBioLock
+
+# The vision stack (cv2, skimage) is imported on first use, so crypto-only users
+# (BioCrypt, FuzzyCommitment) start fast.
+_LAZY_VISION = ('RealFingerprintExtractor', 'ImageInput', 'load_gray', 'QualityGate', 'QualityError')
+
+def __getattr__(name):
+    if name in _LAZY_VISION:
+        from . import biometric_vision
+        return getattr(biometric_vision, name)
+    if name == 'AsyncBioLock':
+        from .aio import AsyncBioLock # asyncio is only imported by async users
+        return AsyncBioLock
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class BioLock:
     """
@@ -9,48 +31,148 @@ class BioLock:
     Simple wrapper for integrating Biometric Cryptography into apps.
     """
     
-    def __init__(self, user_secret_seed: str):
+    def __init__(self, user_secret_seed: str, **vision_options):
         """
         Initialize with a 32-byte hex string (User's Master Secret).
         Store this securely on the device (Keystore/Keychain).
+        vision_options: RealFingerprintExtractor options (skeleton_backend, roi_crop, ...).
+        Records only unlock reliably with the options they were enrolled with.
         """
         self.engine = BioCrypt(user_secret_seed)
-        self.vision = RealFingerprintExtractor()
+        self.vision_options = vision_options
+        self._vision = None
+        self._vision_lock = threading.Lock()
+
+    @property
+    def vision(self) -> 'RealFingerprintExtractor':
+        """Fingerprint extractor, created (and cv2/skimage imported) on first use; safe to share across threads."""
+        if self._vision is None:
+            with self._vision_lock:
+                if self._vision is None:
+                    from .biometric_vision import RealFingerprintExtractor
+                    self._vision = RealFingerprintExtractor(**self.vision_options)
+        return self._vision
         
-    def enroll_from_image(self, image_path: str, service_name: str) -> dict:
+    def enroll_from_image(self, image: 'ImageInput', service_name: str) -> dict:
         """
-        Generates a biometric lock for a specific service using an image.
+        Generates a biometric lock for a specific service using an image
+        (file path, encoded bytes straight from the upload, or a grayscale ndarray).
         Returns: Public Enrollment Record (Dict) -> Save this JSON database!
         """
         # 1. Extract
-        minutiae = self.vision.extract(image_path)
-        if len(minutiae) < 8:
-            raise ValueError(f"Image quality too low. Found {len(minutiae)} features, need 8.")
+        points = self.vision.extract_points(image)
+        return self._enroll_points(points, service_name)
+
+    def _enroll_points(self, points, service_name: str) -> dict:
+        if len(points) < 8:
+            raise ValueError(f"Image quality too low. Found {len(points)} features, need 8.")
             
         # 2. Wrap in internal object
-        fp = Fingerprint(seed=None, num_minutiae=0)
-        fp.minutiae = minutiae
+        fp = Fingerprint.from_array(points)
         
         # 3. Operations
         # For robustness, we assume single-shot enrollment for now
         # In prod, pass list of 3-5 images: [fp1, fp2, ...]
         return self.engine.enroll([fp], service_name)
 
-    def unlock_from_image(self, image_path: str, service_name: str, enrollment_record: dict) -> str:
+    def enroll_from_images(self, images: List['ImageInput'], service_name: str, max_workers: int = None,
+                           use_processes: bool = False) -> Tuple[dict, List[float]]:
+        """
+        Multi-scan enrollment: extracts every capture concurrently, then majority-votes them.
+        Returns: (Public Enrollment Record, extraction ms per image)
+        """
+        if not images:
+            raise ValueError("At least one image is required.")
+            
+        # 1. Extract (in parallel)
+        all_points, timings = self.vision.extract_points_many(images, max_workers, use_processes)
+        return self._enroll_many_points(all_points, service_name), timings
+
+    def _enroll_many_points(self, all_points, service_name: str) -> dict:
+        for i, points in enumerate(all_points):
+            if len(points) < 8:
+                raise ValueError(f"Image quality too low (image {i}). Found {len(points)} features, need 8.")
+                
+        # 2. Majority vote over all captures
+        fps = [Fingerprint.from_array(points) for points in all_points]
+        return self.engine.enroll(fps, service_name)
+
+    def unlock_from_image(self, image: 'ImageInput', service_name: str, enrollment_record: dict) -> str:
         """
-        Attempts to unlock using a fresh image.
+        Attempts to unlock using a fresh image (path, encoded bytes or grayscale ndarray).
         Returns: 
            - Hex Key String (if success)
-           - None (if moved/spoofed/wrong finger)
+           - None (if moved/spoofed/wrong finger, or rejected by the quality gate)
         """
+        from .biometric_vision import QualityError
         # 1. Extract
-        minutiae = self.vision.extract(image_path)
-        if len(minutiae) < 8:
+        try:
+            points = self.vision.extract_points(image)
+        except QualityError:
+            return None
+        return self._unlock_points(points, service_name, enrollment_record)
+
+    def _unlock_points(self, points, service_name: str, enrollment_record: dict) -> str:
+        if len(points) < 8:
             # Optionally return None or raise
             return None
             
-        fp = Fingerprint(seed=None, num_minutiae=0)
-        fp.minutiae = minutiae
+        fp = Fingerprint.from_array(points)
         
         # 2. Authenticate
         return self.engine.authenticate(fp, service_name, enrollment_record)
+
+    def enroll_from_frames(self, frames: Iterable['ImageInput'], service_name: str, min_frames: int = 3,
+                           stable_frames: int = 2, max_frames: int = None) -> dict:
+        """
+        Streaming enrollment from a sensor burst: frames are pulled and extracted one at a time,
+        and extraction stops as soon as the per-byte vote is stable (see BioCrypt.enroll_stream).
+        Frames with too few features are skipped.
+        Returns: { 'record', 'frames': pulled, 'used': voted, 'rejected': low-quality frames,
+                   'stable', 'time_to_decision_ms', 'extract_ms': per extracted frame }
+        """
+        stats = {'frames': 0, 'rejected': 0, 'extract_ms': []}
+        result = self.engine.enroll_stream(self._frame_scans(frames, stats, max_frames), service_name,
+                                           min_frames, stable_frames)
+        return self._frame_result(result, stats)
+
+    def unlock_from_frames(self, frames: Iterable['ImageInput'], service_name: str, enrollment_record: dict,
+                           max_frames: int = None) -> dict:
+        """
+        Streaming unlock from a sensor burst: stops extracting at the first frame (or running vote)
+        that unlocks (see BioCrypt.unlock_stream). Every frame is one more attempt, so cap bursts
+        with max_frames where FAR matters.
+        Returns: { 'key', 'frames', 'used', 'rejected', 'attempts', 'via', 'time_to_decision_ms', 'extract_ms' }
+        """
+        stats = {'frames': 0, 'rejected': 0, 'extract_ms': []}
+        result = self.engine.unlock_stream(self._frame_scans(frames, stats, max_frames), service_name,
+                                           enrollment_record)
+        return self._frame_result(result, stats)
+
+    def _frame_scans(self, frames: Iterable['ImageInput'], stats: dict, max_frames: int = None) -> Iterator[Fingerprint]:
+        from .biometric_vision import QualityError
+        # Lazy: a frame is only pulled and decoded when the stream consumer asks for the next scan,
+        # and never once max_frames is reached (a live sensor would capture it for nothing)
+        frames = iter(frames)
+        while max_frames is None or stats['frames'] < max_frames:
+            frame = next(frames, None)
+            if frame is None:
+                return
+            stats['frames'] += 1
+            t0 = time.perf_counter()
+            try:
+                points = self.vision.extract_points(frame)
+            except QualityError:
+                points = () # Gated frames are dropped like sparse ones, in a fraction of the time
+            stats['extract_ms'].append((time.perf_counter() - t0) * 1000)
+            if len(points) < 8:
+                stats['rejected'] += 1
+                continue
+            yield Fingerprint.from_array(points)
+
+    @staticmethod
+    def _frame_result(result: dict, stats: dict) -> dict:
+        # The engine counted usable scans; report frames pulled from the stream instead
+        scans = result.pop('scans')
+        result.setdefault('used', scans)
+        return {**result, **stats}
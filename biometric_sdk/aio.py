@@ -0,0 +1,135 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from . import BioLock
+
+if TYPE_CHECKING:
+    from .biometric_vision import ImageInput
+
+# Per-process extractors for process executors, one per AsyncBioLock (keyed by its token).
+# Options are not a usable key: a TemplateCache arrives as a fresh copy with every call.
+_process_extractors = {}
+
+def _extract_in_process(key: str, vision_options: dict, image) -> Tuple[object, float]:
+    extractor = _process_extractors.get(key)
+    if extractor is None:
+        from .biometric_vision import RealFingerprintExtractor
+        extractor = _process_extractors[key] = RealFingerprintExtractor(**vision_options)
+    t0 = time.perf_counter()
+    points = extractor.extract_points(image)
+    return points, (time.perf_counter() - t0) * 1000
+
+class AsyncBioLock:
+    """
+    asyncio front end for BioLock.
+    Image decode + extraction (the slow, CPU-bound part) runs in an executor; the crypto
+    step (well under a millisecond) runs on the event loop thread.
+    At most `max_concurrency` operations are in flight; further calls wait on a semaphore,
+    so a burst of requests queues up instead of piling work onto the executor.
+    Cancelling a call that is still waiting drops it; one already extracting finishes in
+    its worker and the result is discarded.
+    If a worker of an owned process pool dies, the calls in flight raise BrokenProcessPool
+    and the pool is replaced for later calls.
+    """
+
+    def __init__(self, user_secret_seed: str, executor: Executor = None, max_concurrency: int = 4,
+                 use_processes: bool = False, **vision_options):
+        """
+        executor: where extraction runs. Default: a thread pool (cv2/skimage release the GIL),
+            or a process pool with use_processes=True; either is shut down by close().
+        max_concurrency: operations in flight at once (backpressure limit).
+        vision_options: RealFingerprintExtractor options, as for BioLock.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.sync = BioLock(user_secret_seed, **vision_options)
+        self.max_concurrency = max_concurrency
+        self._owns_executor = executor is None
+        if executor is None:
+            pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            executor = pool(max_workers=max_concurrency)
+        self.executor = executor
+        self._in_process = isinstance(executor, ProcessPoolExecutor)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._process_key = uuid.uuid4().hex
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shuts the executor down if AsyncBioLock created it (queued work is cancelled)."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _extract(self, image) -> Tuple[object, float]:
+        loop = asyncio.get_running_loop()
+        if self._in_process:
+            executor = self.executor
+            try:
+                return await loop.run_in_executor(executor, _extract_in_process, self._process_key,
+                                                  self.sync.vision_options, image)
+            except BrokenProcessPool:
+                # A dead worker fails every later submit too: replace our pool (once) for the next call
+                if self._owns_executor and self.executor is executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+                raise
+        return await loop.run_in_executor(self.executor, self._extract_sync, image)
+
+    async def _extract_limited(self, image) -> Tuple[object, float]:
+        async with self._slots:
+            return await self._extract(image)
+
+    def _extract_sync(self, image) -> Tuple[object, float]:
+        # Runs in the executor, so the first call's cv2/skimage import does not block the loop
+        from .biometric_vision import _timed_extract
+        return _timed_extract(self.sync.vision, image)
+
+    async def enroll_from_image(self, image: 'ImageInput', service_name: str) -> dict:
+        """Async BioLock.enroll_from_image. Returns: Public Enrollment Record."""
+        points, _ = await self._extract_limited(image)
+        return self.sync._enroll_points(points, service_name)
+
+    async def enroll_from_images(self, images: List['ImageInput'], service_name: str) -> Tuple[dict, List[float]]:
+        """
+        Async multi-scan enrollment: captures are extracted concurrently, each holding one slot.
+        Returns: (Public Enrollment Record, extraction ms per image)
+        """
+        if not images:
+            raise ValueError("At least one image is required.")
+        results = await asyncio.gather(*(self._extract_limited(image) for image in images))
+        record = self.sync._enroll_many_points([points for points, _ in results], service_name)
+        return record, [ms for _, ms in results]
+
+    async def unlock_from_image(self, image: 'ImageInput', service_name: str, enrollment_record: dict) -> Optional[str]:
+        """Async BioLock.unlock_from_image. Returns: Hex Key String, or None."""
+        try:
+            points, _ = await self._extract_limited(image)
+        except ValueError as e:
+            from .biometric_vision import QualityError # Loaded by now: extraction raised it
+            if not isinstance(e, QualityError):
+                raise
+            return None
+        return self.sync._unlock_points(points, service_name, enrollment_record)
+
+    async def unlock_many(self, requests: Iterable[Tuple['ImageInput', str, dict]],
+                          return_exceptions: bool = False) -> List[Optional[str]]:
+        """
+        Runs (image, service_name, enrollment_record) unlocks concurrently, max_concurrency at a time.
+        return_exceptions: as for asyncio.gather (otherwise the first error cancels the rest).
+        Returns: Hex Key (or None, or the exception) per request, in order.
+        """
+        tasks = [asyncio.ensure_future(self.unlock_from_image(image, service, record))
+                 for image, service, record in requests]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            for task in tasks:
+                task.cancel() # No-op for finished tasks; stops the rest on error or cancellation
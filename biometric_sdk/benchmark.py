@@ -0,0 +1,778 @@
+"""
+BioLock SDK Benchmarks.
+Usage: python benchmark.py <suite> [options]
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from biometric_core import Minutia, Fingerprint, array_to_minutiae
+from biometric_vision import (RealFingerprintExtractor, QualityGate, QualityError, NEIGHBOURS, SKELETON_BACKENDS,
+                              available_skeleton_backends)
+from geometric_quantizer import GeometricQuantizer
+from ecc_wrapper import SmallRSCodec
+from reedsolo import RSCodec, ReedSolomonError
+from secure_mask import SecureMask
+from bio_crypt import BioCrypt, GridSweep
+from cli_wrapper import DEV_SEED
+from enrollment_store import EnrollmentStore
+from record_format import RECORD_DTYPE, RECORD_MAGIC, RECORD_VERSION, records_to_dicts
+
+def synthetic_fingerprint(size: int = 500, seed: int = 0) -> np.ndarray:
+    """
+    Renders a reproducible whorl-like ridge pattern (dark ridges on a light pad),
+    so benchmarks do not depend on private sensor captures.
+    """
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float64)
+    cx = size * (0.5 + rng.uniform(-0.05, 0.05))
+    cy = size * (0.5 + rng.uniform(-0.05, 0.05))
+    r = np.hypot(xx - cx, yy - cy)
+    theta = np.arctan2(yy - cy, xx - cx)
+
+    # Ridge period ~ 9px at 500x500; warp the rings so ridges end and split
+    period = size / 55.0
+    warp = 1.5 * np.sin(2 * theta + rng.uniform(0, 2 * np.pi))
+    warp += 0.8 * np.sin(3 * theta + r / (0.2 * size))
+    # Elliptic finger pad
+    pad = ((xx - cx) / (0.38 * size)) ** 2 + ((yy - cy) / (0.45 * size)) ** 2 <= 1.0
+
+    # Each phase vortex inside the pad creates one ridge ending / bifurcation
+    for _ in range(30):
+        vx, vy = rng.uniform(0.2 * size, 0.8 * size, size=2)
+        warp += rng.choice([-1.0, 1.0]) * np.arctan2(yy - vy, xx - vx)
+    ridges = 0.5 + 0.5 * np.cos(2 * np.pi * r / period + warp)
+
+    img = 230.0 - 170.0 * ridges * pad
+    img += rng.normal(0, 12, size=img.shape)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+def legacy_scan_minutiae(skeleton_uint8: np.ndarray, target_size=(500, 500)) -> list[Minutia]:
+    """Original per-pixel Crossing Number loop, kept as the reference baseline."""
+    minutiae = []
+    rows, cols = skeleton_uint8.shape
+    count = 0
+    for r in range(1, rows - 1):
+        for c in range(1, cols - 1):
+            if skeleton_uint8[r, c] == 1:
+                values = [int(skeleton_uint8[r+dy, c+dx]) for dy, dx in NEIGHBOURS]
+                crossings = 0
+                for i in range(8):
+                    crossings += abs(values[i] - values[(i+1)%8])
+                cn = crossings // 2
+
+                m_type = None
+                if cn == 1:
+                    m_type = 'ridge_ending'
+                elif cn == 3:
+                    m_type = 'bifurcation'
+
+                if m_type:
+                    norm_x = (c / cols) * target_size[0]
+                    norm_y = (r / rows) * target_size[1]
+                    angle = 0.0
+                    if cn == 1:
+                        for i, (dy, dx) in enumerate(NEIGHBOURS):
+                            if values[i] == 1:
+                                angle = math.degrees(math.atan2(dy, dx))
+                                break
+                    minutiae.append(Minutia(id=count, x=norm_x, y=norm_y, angle=angle, type=m_type))
+                    count += 1
+    return minutiae
+
+def legacy_filter_minutiae(minutiae: list[Minutia], threshold=10.0) -> list[Minutia]:
+    """Original all-pairs de-duplication filter, kept as the reference baseline."""
+    valid = []
+    for m in minutiae:
+        if m.x < 20 or m.x > 480 or m.y < 20 or m.y > 480:
+            continue
+        is_good = True
+        for existing in valid:
+            dist = math.sqrt((m.x - existing.x)**2 + (m.y - existing.y)**2)
+            if dist < threshold:
+                is_good = False
+                break
+        if is_good:
+            valid.append(m)
+    return valid
+
+def binarize(img: np.ndarray) -> np.ndarray:
+    """Runs the extractor's preprocessing up to (and including) the adaptive threshold."""
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    img = cv2.GaussianBlur(clahe.apply(img), (5, 5), 0)
+    return cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY_INV, 11, 2)
+
+def skeleton_of(img: np.ndarray, backend: str = 'skimage') -> np.ndarray:
+    """Runs the extractor's preprocessing up to (and including) skeletonization."""
+    return SKELETON_BACKENDS[backend](binarize(img))
+
+def matched_minutiae(ref: np.ndarray, other: np.ndarray, tol: float) -> int:
+    """Greedy one-to-one matching of same-type minutiae closer than `tol` px, nearest pairs first."""
+    if len(ref) == 0 or len(other) == 0:
+        return 0
+    d = np.hypot(ref['x'][:, None] - other['x'][None, :], ref['y'][:, None] - other['y'][None, :])
+    d[ref['type'][:, None] != other['type'][None, :]] = np.inf
+    rows, cols = np.nonzero(d <= tol)
+    used_ref, used_other = set(), set()
+    for k in np.argsort(d[rows, cols], kind='stable').tolist():
+        i, j = rows[k], cols[k]
+        if i not in used_ref and j not in used_other:
+            used_ref.add(i)
+            used_other.add(j)
+    return len(used_ref)
+
+def best_of(fn, repeat: int) -> float:
+    """Best wall time of `repeat` runs, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+def bench_crossing_number(args):
+    extractor = RealFingerprintExtractor()
+    print(f"{'size':>6} {'minutiae':>9} {'loop ms':>10} {'vector ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        skeleton = skeleton_of(synthetic_fingerprint(size, seed=args.seed))
+        expected = legacy_scan_minutiae(skeleton)
+        got = array_to_minutiae(extractor._scan_minutiae(skeleton))
+        if got != expected:
+            raise AssertionError(f"Vectorized scan diverged from the reference loop at size {size}")
+
+        loop_ms = best_of(lambda: legacy_scan_minutiae(skeleton), args.repeat)
+        vec_ms = best_of(lambda: extractor._scan_minutiae(skeleton), args.repeat)
+        print(f"{size:>6} {len(got):>9} {loop_ms:>10.2f} {vec_ms:>10.2f} {loop_ms / vec_ms:>7.1f}x")
+
+def bench_filter(args):
+    extractor = RealFingerprintExtractor()
+    print(f"{'size':>6} {'raw':>7} {'kept':>6} {'pairwise ms':>12} {'grid ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        raw = extractor._scan_minutiae(skeleton_of(synthetic_fingerprint(size, seed=args.seed)))
+        raw_list = array_to_minutiae(raw)
+        expected = legacy_filter_minutiae(raw_list)
+        got = array_to_minutiae(extractor._filter_minutiae(raw))
+        if got != expected:
+            raise AssertionError(f"Grid filter diverged from the reference filter at size {size}")
+
+        ref_ms = best_of(lambda: legacy_filter_minutiae(raw_list), args.repeat)
+        grid_ms = best_of(lambda: extractor._filter_minutiae(raw), args.repeat)
+        print(f"{size:>6} {len(raw):>7} {len(got):>6} {ref_ms:>12.2f} {grid_ms:>9.2f} {ref_ms / grid_ms:>7.1f}x")
+
+def bench_skeleton(args):
+    backends = available_skeleton_backends()
+    missing = sorted(set(SKELETON_BACKENDS) - set(backends))
+    if missing:
+        print(f"(skipping {', '.join(missing)}: cv2.ximgproc not available)")
+    images = [(f"synth{args.seed + i}", synthetic_fingerprint(args.size, seed=args.seed + i)) for i in range(args.images)]
+    images += [(os.path.basename(path), cv2.imread(path, cv2.IMREAD_GRAYSCALE)) for path in args.paths]
+
+    # Agreement is against the 'skimage' reference, after the extractor's border/distance filter
+    # overlap: share of skeleton pixels within 1px of the reference skeleton
+    print(f"{'backend':>17} {'thin ms':>8} {'extract ms':>11} {'overlap':>8} {'minutiae':>9} {'recall':>7} {'precision':>10}")
+    reference = RealFingerprintExtractor(skeleton_backend='skimage')
+    ref_points = [reference._extract_gray(img) for _, img in images]
+    bins = [binarize(img) for _, img in images]
+    near_ref = [cv2.dilate(SKELETON_BACKENDS['skimage'](b), np.ones((3, 3), np.uint8)) for b in bins]
+    for backend in backends:
+        extractor = RealFingerprintExtractor(skeleton_backend=backend)
+        thin = SKELETON_BACKENDS[backend]
+        thin_ms = sum(best_of(lambda: thin(b), args.repeat) for b in bins) / len(bins)
+        extract_ms = sum(best_of(lambda: extractor._extract_gray(img), args.repeat) for _, img in images) / len(images)
+        skeletons = [thin(b) for b in bins]
+        overlap = sum(int((s & n).sum()) for s, n in zip(skeletons, near_ref)) / max(sum(int(s.sum()) for s in skeletons), 1)
+        points = [extractor._extract_gray(img) for _, img in images]
+        matched = sum(matched_minutiae(r, p, args.tol) for r, p in zip(ref_points, points))
+        total_ref = sum(len(r) for r in ref_points)
+        total = sum(len(p) for p in points)
+        print(f"{backend:>17} {thin_ms:>8.2f} {extract_ms:>11.2f} {overlap:>8.1%} {total / len(images):>9.1f} "
+              f"{matched / max(total_ref, 1):>7.1%} {matched / max(total, 1):>10.1%}")
+
+def bench_roi(args):
+    full = RealFingerprintExtractor()
+    roi = RealFingerprintExtractor(roi_crop=True, roi_block=args.block, roi_ratio=args.ratio)
+    images = [(f"synth{args.seed + i}", synthetic_fingerprint(args.size, seed=args.seed + i)) for i in range(args.images)]
+    images += [(os.path.basename(path), cv2.imread(path, cv2.IMREAD_GRAYSCALE)) for path in args.paths]
+
+    # 'kept': full-frame minutiae inside the foreground that the cropped run also finds
+    print(f"{'image':>12} {'crop':>6} {'full ms':>8} {'roi ms':>7} {'speedup':>8} {'full':>6} {'fg':>5} {'roi':>5} {'kept':>6}")
+    for name, img in images:
+        box = roi._roi_box(roi.foreground_blocks(img), img.shape)
+        crop = 0.0 if box is None else (box[1] - box[0]) * (box[3] - box[2]) / img.size
+        full_points = full._extract_gray(img)
+        roi_points = roi._extract_gray(img)
+        fg = roi.foreground_blocks(img)
+        rows = np.minimum((full_points['y'] / full.target_size[1] * img.shape[0]).astype(int) // args.block, fg.shape[0] - 1)
+        cols = np.minimum((full_points['x'] / full.target_size[0] * img.shape[1]).astype(int) // args.block, fg.shape[1] - 1)
+        fg_points = full_points[fg[rows, cols]]
+        kept = matched_minutiae(fg_points, roi_points, args.tol) / max(len(fg_points), 1)
+
+        full_ms = best_of(lambda: full._extract_gray(img), args.repeat)
+        roi_ms = best_of(lambda: roi._extract_gray(img), args.repeat)
+        print(f"{name:>12} {crop:>6.0%} {full_ms:>8.2f} {roi_ms:>7.2f} {full_ms / roi_ms:>7.1f}x "
+              f"{len(full_points):>6} {len(fg_points):>5} {len(roi_points):>5} {kept:>6.0%}")
+
+def bench_quantizer(args):
+    quantizer = GeometricQuantizer()
+    mask = SecureMask(bytes(32), "benchmark")
+    anchor_sets = [mask.select_anchors(Fingerprint(seed=args.seed + i)) for i in range(args.fingerprints)]
+
+    # Every fingerprint under every grid offset of a small lattice
+    grid = [(d, t) for d in np.linspace(-25, 25, args.offsets) for t in np.linspace(-60, 60, args.offsets)]
+    anchors = np.repeat(GeometricQuantizer.anchor_tensor(anchor_sets), len(grid), axis=0)
+    off_d = np.tile([d for d, _ in grid], len(anchor_sets))
+    off_t = np.tile([t for _, t in grid], len(anchor_sets))
+
+    def scalar():
+        return [quantizer.compute_feature_bytes(a, d, t)
+                for a, d, t in zip(np.repeat(anchor_sets, len(grid), axis=0), off_d.tolist(), off_t.tolist())]
+
+    expected = np.frombuffer(b"".join(scalar()), dtype=np.uint8).reshape(len(anchors), -1)
+    got = quantizer.compute_feature_bytes_batch(anchors, off_d, off_t)
+    if not np.array_equal(got, expected):
+        raise AssertionError("Batch quantizer diverged from compute_feature_bytes")
+
+    scalar_ms = best_of(scalar, args.repeat)
+    batch_ms = best_of(lambda: quantizer.compute_feature_bytes_batch(anchors, off_d, off_t), args.repeat)
+    print(f"{len(anchors)} vectors ({args.fingerprints} fingerprints x {len(grid)} offsets)")
+    print(f"scalar: {scalar_ms:.2f} ms ({len(anchors) / scalar_ms * 1000:,.0f}/s)")
+    print(f"batch:  {batch_ms:.2f} ms ({len(anchors) / batch_ms * 1000:,.0f}/s)  {scalar_ms / batch_ms:.1f}x")
+
+def noisy_codewords(codec: SmallRSCodec, count: int, errors: int, seed: int) -> np.ndarray:
+    """Random codewords with `errors` corrupted bytes each."""
+    rng = np.random.default_rng(seed)
+    words = np.array([np.frombuffer(codec.encode(m.tobytes()), dtype=np.uint8)
+                      for m in rng.integers(0, 256, size=(count, codec.msg_len), dtype=np.uint8)])
+    for row in words:
+        pos = rng.choice(codec.n, size=errors, replace=False)
+        row[pos] ^= rng.integers(1, 256, size=errors, dtype=np.uint8)
+    return words
+
+def bench_rs(args):
+    reference = RSCodec(args.parity)
+    codec = SmallRSCodec(args.parity, args.secret)
+    print(f"RS({args.secret + args.parity},{args.secret}), {args.count} codewords per row")
+    print(f"{'errors':>6} {'failed':>7} {'reedsolo/s':>12} {'scalar/s':>12} {'batch/s':>12}")
+    for errors in args.errors:
+        words = noisy_codewords(codec, args.count, errors, args.seed)
+        rows = [bytearray(w.tobytes()) for w in words]
+
+        def ref_decode():
+            out = []
+            for w in rows:
+                try:
+                    out.append(bytes(reference.decode(w)[0]))
+                except ReedSolomonError:
+                    out.append(None)
+            return out
+
+        def scalar_decode():
+            out = []
+            for w in rows:
+                try:
+                    out.append(codec.decode(bytes(w)))
+                except ReedSolomonError:
+                    out.append(None)
+            return out
+
+        expected = ref_decode()
+        messages, ok = codec.decode_many(words)
+        batch = [m.tobytes() if success else None for m, success in zip(messages, ok.tolist())]
+        if scalar_decode() != expected or batch != expected:
+            raise AssertionError(f"SmallRSCodec diverged from reedsolo with {errors} errors")
+
+        rates = [args.count / best_of(fn, args.repeat) * 1000
+                 for fn in (ref_decode, scalar_decode, lambda: codec.decode_many(words))]
+        failed = sum(r is None for r in expected)
+        print(f"{errors:>6} {failed:>7} {rates[0]:>12,.0f} {rates[1]:>12,.0f} {rates[2]:>12,.0f}")
+
+SDK_DIR = os.path.dirname(os.path.abspath(__file__))
+# Import statements timed by the startup suite; 'crypto' is held to the budget
+STARTUP_TARGETS = {
+    'crypto': 'import bio_crypt, ecc_wrapper',
+    'package': 'import biometric_sdk',
+    'cli': 'import cli_wrapper',
+}
+VISION_MODULES = ('cv2', 'skimage')
+
+def import_profile(statement: str):
+    """
+    Runs `statement` in a fresh interpreter under -X importtime.
+    Returns: (total import ms, names of all imported modules)
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([SDK_DIR, os.path.dirname(SDK_DIR), env.get('PYTHONPATH', '')])
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                          env=env, capture_output=True, text=True, check=True)
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.add(name.strip())
+        if not name[1:].startswith(' '): # top-level import (not nested)
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+def bench_startup(args):
+    print(f"{'target':>8} {'best ms':>9} {'vision':>7}  statement")
+    failures = []
+    for target, statement in STARTUP_TARGETS.items():
+        runs = [import_profile(statement) for _ in range(args.repeat)]
+        best = min(ms for ms, _ in runs)
+        vision = sorted({m.split('.')[0] for m in runs[0][1]} & set(VISION_MODULES))
+        print(f"{target:>8} {best:>9.1f} {','.join(vision) or '-':>7}  {statement}")
+        if vision:
+            failures.append(f"{target}: imports {', '.join(vision)} eagerly")
+        if target == 'crypto' and best > args.budget:
+            failures.append(f"{target}: {best:.1f} ms > budget {args.budget:.1f} ms")
+    if failures:
+        sys.exit("FAIL: " + "; ".join(failures))
+
+def percentiles_us(samples):
+    """Seconds -> {'mean', 'p50', 'p95'} in microseconds."""
+    if not samples:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0}
+    arr = np.asarray(samples) * 1e6
+    return {'mean': float(arr.mean()), 'p50': float(np.percentile(arr, 50)), 'p95': float(np.percentile(arr, 95))}
+
+def stage_latencies(bio: BioCrypt, service: str, pairs) -> dict:
+    """
+    Times authenticate's stages one by one over (live_fp, record) pairs:
+    mask (cached SecureMask + anchor selection), quantizer, RS decode (unlock), HKDF (verify + derive).
+    """
+    stages = {'mask': [], 'quantizer': [], 'rs_decode': [], 'hkdf': []}
+    for live_fp, record in pairs:
+        grid = record['helper_grid']
+        t0 = time.perf_counter()
+        anchors = bio._mask(service).select_anchors(live_fp)
+        t1 = time.perf_counter()
+        vector = bio.quantizer.compute_feature_bytes(anchors, grid['offset_d'], grid['offset_theta'])
+        t2 = time.perf_counter()
+        try:
+            secret = bio.fcs.unlock(vector, bytes.fromhex(record['helper_ecc']))
+        except Exception:
+            secret = None
+        t3 = time.perf_counter()
+        stages['mask'].append(t1 - t0)
+        stages['quantizer'].append(t2 - t1)
+        stages['rs_decode'].append(t3 - t2)
+        if secret is not None:
+            bio._verify_and_derive(secret, service, record)
+            stages['hkdf'].append(time.perf_counter() - t3)
+    return {name: percentiles_us(samples) for name, samples in stages.items()}
+
+def bench_pipeline(args):
+    """
+    Seeded population -> enroll -> genuine and impostor attempts per noise level.
+    FAR: impostor scans that unlock someone else's record. FRR: genuine scans that fail.
+    FTE: users whose enrollment raised (e.g. too few anchors).
+    """
+    bio = BioCrypt(user_seed_hex=args.secret)
+    service = 'BenchApp'
+    # With --json - the report owns stdout
+    out = sys.stderr if args.json == '-' else sys.stdout
+    results = []
+    stage_pairs = []
+    print(f"{'noise':>6} {'users':>6} {'FTE':>4} {'FRR':>7} {'FAR':>7} {'enroll/s':>9} {'auth/s':>9}", file=out)
+    for noise in args.noise:
+        # Same seeds for every noise level, so rows are comparable
+        rng = random.Random(args.seed)
+        users = [Fingerprint(seed=args.seed + i, num_minutiae=args.minutiae) for i in range(args.users)]
+
+        records = []
+        t0 = time.perf_counter()
+        for fp in users:
+            try:
+                records.append(bio.enroll([fp.scan(noise, rng) for _ in range(args.enroll_scans)], service))
+            except Exception:
+                records.append(None)
+        enroll_s = time.perf_counter() - t0
+        enrolled = [i for i, r in enumerate(records) if r is not None]
+
+        attempts = []
+        for i in enrolled:
+            for _ in range(args.genuine):
+                attempts.append((True, users[i].scan(noise, rng), records[i]))
+            for k in range(1, args.impostors + 1):
+                # Impostors are the next users in the population (wrapping around)
+                j = enrolled[(enrolled.index(i) + k) % len(enrolled)]
+                if j != i:
+                    attempts.append((False, users[j].scan(noise, rng), records[i]))
+
+        t0 = time.perf_counter()
+        outcomes = [bio.authenticate(fp, service, record) is not None for _, fp, record in attempts]
+        auth_s = time.perf_counter() - t0
+
+        genuine = [ok for (is_genuine, _, _), ok in zip(attempts, outcomes) if is_genuine]
+        impostor = [ok for (is_genuine, _, _), ok in zip(attempts, outcomes) if not is_genuine]
+        row = {
+            'noise': noise,
+            'users': args.users,
+            'fte': args.users - len(enrolled),
+            'genuine_attempts': len(genuine),
+            'impostor_attempts': len(impostor),
+            'frr': (len(genuine) - sum(genuine)) / max(len(genuine), 1),
+            'far': sum(impostor) / max(len(impostor), 1),
+            'enroll_per_s': len(users) / enroll_s if enroll_s else 0.0,
+            'auth_per_s': len(attempts) / auth_s if auth_s else 0.0,
+        }
+        results.append(row)
+        stage_pairs += [(fp, record) for is_genuine, fp, record in attempts if is_genuine][:args.stage_samples]
+        print(f"{noise:>6g} {row['users']:>6} {row['fte']:>4} {row['frr']:>7.2%} {row['far']:>7.2%} "
+              f"{row['enroll_per_s']:>9,.0f} {row['auth_per_s']:>9,.0f}", file=out)
+
+    stages = stage_latencies(bio, service, stage_pairs)
+    print(f"{'stage':>10} {'mean us':>9} {'p50 us':>9} {'p95 us':>9}", file=out)
+    for name, stats in stages.items():
+        print(f"{name:>10} {stats['mean']:>9.1f} {stats['p50']:>9.1f} {stats['p95']:>9.1f}", file=out)
+
+    if args.json:
+        report = {
+            'suite': 'pipeline',
+            'config': {k: v for k, v in vars(args).items() if k not in ('run', 'json', 'secret')},
+            'environment': {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine()},
+            'results': results,
+            'stages_us': stages,
+        }
+        if args.json == '-':
+            print(json.dumps(report, indent=2))
+        else:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+
+def bench_sweep(args):
+    """
+    Genuine vs impostor accepts with and without a GridSweep, on the same attempts.
+    Each sweep candidate is one more unlock attempt, so impostor accepts are the price of the recovered genuine ones.
+    """
+    bio = BioCrypt(user_seed_hex=args.secret)
+    service = 'BenchApp'
+    rng = random.Random(args.seed)
+    users = [Fingerprint(seed=args.seed + i, num_minutiae=args.minutiae) for i in range(args.users)]
+    records = []
+    for fp in users:
+        try:
+            records.append(bio.enroll([fp.scan(args.noise, rng) for _ in range(args.enroll_scans)], service))
+        except Exception:
+            records.append(None)
+    enrolled = [i for i, r in enumerate(records) if r is not None]
+    genuine = [(users[i].scan(args.noise, rng), records[i]) for i in enrolled]
+    # Impostors: the next enrolled user's scan against each record
+    impostor = [(users[enrolled[(k + 1) % len(enrolled)]].scan(args.noise, rng), records[i])
+                for k, i in enumerate(enrolled)]
+
+    sweeps = [('none', None), ('default', GridSweep())]
+    sweeps += [(f"{steps} steps", GridSweep(steps_d=steps, steps_theta=steps, max_attempts=(2 * steps + 1) ** 2))
+               for steps in args.steps]
+    print(f"noise {args.noise:g}, {len(genuine)} genuine and {len(impostor)} impostor attempts")
+    print(f"{'sweep':>16} {'max att':>8} {'genuine':>8} {'impostor':>9} {'FRR':>7} {'FAR':>7} {'auth/s':>8}")
+    for name, sweep in sweeps:
+        t0 = time.perf_counter()
+        genuine_ok = sum(bio.authenticate(fp, service, record, sweep=sweep) is not None for fp, record in genuine)
+        impostor_ok = sum(bio.authenticate(fp, service, record, sweep=sweep) is not None for fp, record in impostor)
+        elapsed = time.perf_counter() - t0
+        max_attempts = sweep.max_attempts if sweep else 1
+        print(f"{name:>16} {max_attempts:>8} {genuine_ok:>8} {impostor_ok:>9} "
+              f"{1 - genuine_ok / max(len(genuine), 1):>7.2%} {impostor_ok / max(len(impostor), 1):>7.2%} "
+              f"{(len(genuine) + len(impostor)) / elapsed:>8,.0f}")
+
+def filler_records(count: int, service: str, seed: int) -> np.ndarray:
+    """Random helpers/verifiers bound to `service`: stand-ins for other users' enrollments."""
+    rng = np.random.default_rng(seed)
+    arr = np.zeros(count, dtype=RECORD_DTYPE)
+    arr['magic'] = RECORD_MAGIC
+    arr['version'] = RECORD_VERSION
+    arr['helper_ecc'] = rng.integers(0, 256, size=(count, 8), dtype=np.uint8)
+    arr['context_hash'] = np.frombuffer(hashlib.sha256(service.encode()).digest(), dtype=np.uint8)
+    arr['verifier'] = rng.integers(0, 256, size=(count, 32), dtype=np.uint8)
+    return arr
+
+def bench_identify(args):
+    bio = BioCrypt(args.secret)
+    service = "benchmark"
+    rng = random.Random(args.seed)
+    fps, records = [], []
+    for i in range(args.enrolled):
+        fp = Fingerprint(seed=args.seed + i)
+        try:
+            records.append(bio.enroll([fp], service))
+            fps.append(fp)
+        except ValueError:
+            pass # SecureMask could not place the anchors for this seed
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EnrollmentStore(os.path.join(tmp, 'records.bin'))
+        store.append(records)
+        with open(store.path, 'ab') as f:
+            f.write(filler_records(args.records - len(records), service, args.seed).tobytes())
+        store = EnrollmentStore(store.path)
+        print(f"{len(store)} records ({len(records)} enrolled fingers), {args.probes} probes")
+
+        probes = [fps[rng.randrange(len(fps))].scan(noise_level=args.noise, rng=rng) for _ in range(args.probes)]
+        as_dicts = records_to_dicts(store.records)
+        for probe in probes[:3]:
+            rows = [m['row'] for m in bio.identify(probe, service, store)['matches']]
+            expected = [i for i, key in enumerate(bio.authenticate_many(probe, service, as_dicts)) if key]
+            if rows != expected:
+                raise AssertionError("identify diverged from authenticate_many")
+
+        loop_ms = best_of(lambda: bio.authenticate_many(probes[0], service, as_dicts), 1)
+        results = []
+        t0 = time.perf_counter()
+        for probe in probes:
+            results.append(bio.identify(probe, service, store))
+        identify_ms = (time.perf_counter() - t0) * 1000 / len(probes)
+        found = sum(1 for r in results if r['matches'])
+        unlock = percentiles_us([r['timings_ms']['unlock'] / 1000 for r in results])
+
+    print(f"authenticate_many (dicts): {loop_ms:9.1f} ms/probe")
+    print(f"identify (memmap store):  {identify_ms:9.1f} ms/probe  {loop_ms / identify_ms:.1f}x  "
+          f"({len(store) / identify_ms * 1000:,.0f} records/s)")
+    print(f"unlock p50/p95: {unlock['p50'] / 1000:.1f} / {unlock['p95'] / 1000:.1f} ms, "
+          f"probes with a match: {found}/{len(probes)}")
+
+def bench_threads(args):
+    """
+    One shared extractor + BioCrypt (what BioLock holds) driven from a thread pool: throughput
+    per thread count, and every result must equal the single-threaded one.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    extractor = RealFingerprintExtractor()
+    bio = BioCrypt(args.secret)
+    service = 'BenchApp'
+    images = [cv2.imencode('.png', synthetic_fingerprint(args.size, args.seed + i))[1].tobytes()
+              for i in range(args.images)]
+    records = [bio.enroll([Fingerprint.from_array(extractor.extract_points(image))], service) for image in images]
+    image_jobs = [(images[i % len(images)], records[i % len(images)]) for i in range(args.unlocks)]
+
+    # Crypto only: simulated scans against simulated enrollments (half impostors)
+    rng = random.Random(args.seed)
+    fps = [Fingerprint(seed=args.seed + i) for i in range(args.images)]
+    fp_records = []
+    for fp in fps:
+        try:
+            fp_records.append((fp, bio.enroll([fp], service)))
+        except ValueError:
+            pass # SecureMask could not place the anchors for this seed
+    crypto_jobs = [(fp_records[(i + (i % 2)) % len(fp_records)][0].scan(1.0, rng), fp_records[i % len(fp_records)][1])
+                   for i in range(args.unlocks * 20)]
+
+    def run_image(job):
+        return bio.authenticate(Fingerprint.from_array(extractor.extract_points(job[0])), service, job[1])
+
+    def run_crypto(job):
+        return bio.authenticate(job[0], service, job[1])
+
+    expected_image = [run_image(job) for job in image_jobs]
+    expected_crypto = [run_crypto(job) for job in crypto_jobs]
+    print(f"{args.unlocks} image unlocks ({args.size}px), {len(crypto_jobs)} crypto-only authentications per row, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'threads':>7} {'image/s':>9} {'speedup':>8} {'crypto/s':>10} {'speedup':>8}")
+    base = None
+    for threads in args.threads:
+        rates = []
+        for fn, jobs, expected in ((run_image, image_jobs, expected_image), (run_crypto, crypto_jobs, expected_crypto)):
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(fn, jobs[:threads])) # Start the workers
+                t0 = time.perf_counter()
+                got = list(pool.map(fn, jobs))
+                elapsed = time.perf_counter() - t0
+            if got != expected:
+                raise AssertionError(f"{fn.__name__} with {threads} threads diverged from the serial results")
+            rates.append(len(jobs) / elapsed)
+        base = base or rates
+        print(f"{threads:>7} {rates[0]:>9,.1f} {rates[0] / base[0]:>7.2f}x {rates[1]:>10,.0f} {rates[1] / base[1]:>7.2f}x")
+
+def degraded_captures(img: np.ndarray, seed: int) -> dict:
+    """The ways a capture goes wrong at the sensor, applied to a good image."""
+    rng = np.random.default_rng(seed)
+    background = np.uint8(np.median(img[:, :img.shape[1] // 10]))
+    partial = np.full_like(img, background)
+    partial[:, :img.shape[1] // 5] = img[:, :img.shape[1] // 5]
+    return {
+        'good': img,
+        'blurred': cv2.GaussianBlur(img, (0, 0), 4),
+        'blank': np.clip(background + rng.normal(0, 3, img.shape), 0, 255).astype(np.uint8),
+        'washed-out': (img // 12 + 200).astype(np.uint8),
+        'partial': partial,
+    }
+
+def bench_quality(args):
+    gate = QualityGate(min_contrast=args.min_contrast, min_focus=args.min_focus, min_coverage=args.min_coverage)
+    plain = RealFingerprintExtractor()
+    gated = RealFingerprintExtractor(quality_gate=gate)
+    captures = []
+    for i in range(args.images):
+        img = synthetic_fingerprint(args.size, seed=args.seed + i)
+        captures += [(kind, capture) for kind, capture in degraded_captures(img, args.seed + i).items()]
+    for path in args.paths:
+        captures.append((os.path.basename(path), cv2.imread(path, cv2.IMREAD_GRAYSCALE)))
+
+    # 1. Per capture kind (first finger, then any --paths): gate decision and cost vs a full extraction
+    kinds = len(captures) // args.images if args.images else 0
+    print(f"{'capture':>12} {'gate ms':>8} {'extract ms':>11} {'decision':>13} {'contrast':>9} {'focus':>6} {'coverage':>9}")
+    for kind, img in captures[:kinds] + captures[kinds * args.images:]:
+        result = gate.assess(img)
+        gate_ms = best_of(lambda: gate.assess(img), args.repeat)
+        extract_ms = best_of(lambda: plain._extract_gray(img), args.repeat)
+        print(f"{kind:>12} {gate_ms:>8.2f} {extract_ms:>11.2f} {result['reason'] or 'pass':>13} "
+              f"{result['contrast']:>9.0f} {result['focus']:>6.2f} {result['coverage']:>9.2f}")
+
+    # 2. The whole stream through a gated extractor; passed captures must extract unchanged
+    for kind, img in captures:
+        try:
+            points = gated._extract_gated(img)
+        except QualityError:
+            continue
+        if not np.array_equal(points, plain._extract_gray(img)):
+            raise AssertionError(f"Gated extraction of a {kind} capture diverged")
+    stats = gate.stats()
+    reasons = ', '.join(f"{reason} {count}" for reason, count in stats['reasons'].items())
+    print(f"\n{stats['checked']} captures: {stats['rejected']} rejected ({stats['reject_rate']:.0%}: {reasons}), "
+          f"gate {stats['gate_ms']:.2f} ms each, extraction {stats['extract_ms']:.1f} ms each")
+    print(f"saved ~{stats['saved_ms']:.0f} ms of extraction for {stats['gate_ms'] * stats['checked']:.0f} ms of gating")
+
+    # 3. A reject in a process-pool worker must reach the caller as QualityError, leaving the pool usable
+    rejected = next(img for kind, img in captures if kind == 'blank')
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        try:
+            pool.submit(gated.extract_points, rejected).result()
+            raise AssertionError("A blank capture passed the gate in a worker process")
+        except QualityError as e:
+            reason = e.reason
+        pool.submit(gated.extract_points, captures[0][1]).result()
+    print(f"process pool: reject raised QualityError ({reason}), pool still usable")
+
+def main():
+    parser = argparse.ArgumentParser(description='BioLock SDK Benchmarks')
+    suites = parser.add_subparsers(dest='suite', required=True)
+
+    cn = suites.add_parser('crossing-number', help='Crossing Number scan: reference loop vs vectorized')
+    cn.add_argument('--sizes', type=int, nargs='+', default=[500, 1000], help='Square image sizes (px)')
+    cn.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    cn.add_argument('--seed', type=int, default=0, help='Synthetic image seed')
+    cn.set_defaults(run=bench_crossing_number)
+
+    flt = suites.add_parser('filter', help='Minutiae de-duplication: all-pairs vs uniform grid')
+    flt.add_argument('--sizes', type=int, nargs='+', default=[500, 1000], help='Square image sizes (px)')
+    flt.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    flt.add_argument('--seed', type=int, default=0, help='Synthetic image seed')
+    flt.set_defaults(run=bench_filter)
+
+    sk = suites.add_parser('skeleton', help='Skeletonization backends: speed and minutiae agreement with skimage')
+    sk.add_argument('--size', type=int, default=500, help='Square synthetic image size (px)')
+    sk.add_argument('--images', type=int, default=5, help='Synthetic images')
+    sk.add_argument('--paths', nargs='*', default=[], help='Extra grayscale captures to include')
+    sk.add_argument('--tol', type=float, default=4.0, help='Max distance (px) for two minutiae to agree')
+    sk.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    sk.add_argument('--seed', type=int, default=0, help='First synthetic image seed')
+    sk.set_defaults(run=bench_skeleton)
+
+    roi = suites.add_parser('roi', help='Foreground ROI crop: full frame vs cropped extraction')
+    roi.add_argument('--size', type=int, default=500, help='Square synthetic image size (px)')
+    roi.add_argument('--images', type=int, default=3, help='Synthetic images')
+    roi.add_argument('--paths', nargs='*', default=[], help='Extra grayscale captures to include')
+    roi.add_argument('--block', type=int, default=16, help='Foreground block size (px)')
+    roi.add_argument('--ratio', type=float, default=0.35, help='Foreground std ratio (see RealFingerprintExtractor)')
+    roi.add_argument('--tol', type=float, default=4.0, help='Max distance (px) for two minutiae to agree')
+    roi.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    roi.add_argument('--seed', type=int, default=0, help='First synthetic image seed')
+    roi.set_defaults(run=bench_roi)
+
+    qz = suites.add_parser('quantizer', help='Feature bytes: scalar vs batched over fingerprints x grid offsets')
+    qz.add_argument('--fingerprints', type=int, default=500, help='Simulated fingerprints')
+    qz.add_argument('--offsets', type=int, default=5, help='Lattice points per axis (offset_d x offset_theta)')
+    qz.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    qz.add_argument('--seed', type=int, default=0, help='First fingerprint seed')
+    qz.set_defaults(run=bench_quantizer)
+
+    rs = suites.add_parser('rs', help='Reed-Solomon decode throughput: reedsolo vs SmallRSCodec')
+    rs.add_argument('--secret', type=int, default=4, help='Message bytes (k)')
+    rs.add_argument('--parity', type=int, default=4, help='Parity bytes (n - k)')
+    rs.add_argument('--count', type=int, default=20000, help='Codewords per error count')
+    rs.add_argument('--errors', type=int, nargs='+', default=[0, 1, 2, 3], help='Corrupted bytes per codeword')
+    rs.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    rs.add_argument('--seed', type=int, default=0, help='Random seed')
+    rs.set_defaults(run=bench_rs)
+
+    st = suites.add_parser('startup', help='Import time of the crypto core (-X importtime), vision stack must stay lazy')
+    st.add_argument('--budget', type=float, default=250.0, help='Max import ms for the crypto core')
+    st.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per target (best is kept)')
+    st.set_defaults(run=bench_startup)
+
+    pl = suites.add_parser('pipeline', help='Simulated population: FAR / FRR / ops per second and per-stage latency')
+    pl.add_argument('--users', type=int, default=200, help='Simulated users')
+    pl.add_argument('--minutiae', type=int, default=40, help='Minutiae per simulated finger')
+    pl.add_argument('--noise', type=float, nargs='+', default=[0.0, 1.0, 2.0, 4.0, 8.0], help='Scan noise levels (px)')
+    pl.add_argument('--enroll-scans', type=int, default=3, help='Scans majority-voted at enrollment')
+    pl.add_argument('--genuine', type=int, default=3, help='Genuine attempts per user')
+    pl.add_argument('--impostors', type=int, default=3, help='Impostor attempts per user')
+    pl.add_argument('--stage-samples', type=int, default=200, help='Genuine attempts per noise level timed stage by stage')
+    pl.add_argument('--secret', default=DEV_SEED, help='BioCrypt seed (hex)')
+    pl.add_argument('--seed', type=int, default=0, help='Population / scan seed')
+    pl.add_argument('--json', help="Write a JSON report to this path ('-' for stdout)")
+    pl.set_defaults(run=bench_pipeline)
+
+    sw = suites.add_parser('sweep', help='GridSweep: genuine accepts recovered vs impostor accepts added')
+    sw.add_argument('--users', type=int, default=300, help='Simulated users')
+    sw.add_argument('--minutiae', type=int, default=40, help='Minutiae per simulated finger')
+    sw.add_argument('--noise', type=float, default=4.0, help='Scan noise (px)')
+    sw.add_argument('--enroll-scans', type=int, default=3, help='Scans majority-voted at enrollment')
+    sw.add_argument('--steps', type=int, nargs='*', default=[2], help='Extra full-lattice sweeps to compare (steps per axis)')
+    sw.add_argument('--secret', default=DEV_SEED, help='BioCrypt seed (hex)')
+    sw.add_argument('--seed', type=int, default=0, help='Population / scan seed')
+    sw.set_defaults(run=bench_sweep)
+
+    idn = suites.add_parser('identify', help='1:N identification: EnrollmentStore sweep vs authenticate_many')
+    idn.add_argument('--records', type=int, default=100000, help='Records in the store (enrolled + filler)')
+    idn.add_argument('--enrolled', type=int, default=200, help='Simulated fingers actually enrolled')
+    idn.add_argument('--probes', type=int, default=20, help='Live scans identified')
+    idn.add_argument('--noise', type=float, default=1.0, help='Probe scan noise (px)')
+    idn.add_argument('--secret', default=DEV_SEED, help='BioCrypt seed (hex)')
+    idn.add_argument('--seed', type=int, default=0, help='Population / scan seed')
+    idn.set_defaults(run=bench_identify)
+
+    th = suites.add_parser('threads', help='Shared extractor/BioCrypt under a thread pool: scaling and result equality')
+    th.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8], help='Thread counts')
+    th.add_argument('--images', type=int, default=8, help='Synthetic images (and simulated fingers) enrolled')
+    th.add_argument('--unlocks', type=int, default=48, help='Image unlocks per row (x20 crypto-only authentications)')
+    th.add_argument('--size', type=int, default=500, help='Square synthetic image size (px)')
+    th.add_argument('--secret', default=DEV_SEED, help='BioCrypt seed (hex)')
+    th.add_argument('--seed', type=int, default=0, help='Image / population seed')
+    th.set_defaults(run=bench_threads)
+
+    qg = suites.add_parser('quality', help='Quality gate: reject cost and reasons vs full extraction on degraded captures')
+    qg.add_argument('--size', type=int, default=500, help='Square synthetic image size (px)')
+    qg.add_argument('--images', type=int, default=4, help='Synthetic fingers (each also blurred, blanked, washed out, cropped)')
+    qg.add_argument('--paths', nargs='*', default=[], help='Extra grayscale captures to include')
+    qg.add_argument('--min-contrast', type=float, default=40.0, help='QualityGate min_contrast')
+    qg.add_argument('--min-focus', type=float, default=0.3, help='QualityGate min_focus')
+    qg.add_argument('--min-coverage', type=float, default=0.25, help='QualityGate min_coverage')
+    qg.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    qg.add_argument('--seed', type=int, default=0, help='First synthetic image seed')
+    qg.set_defaults(run=bench_quality)
+
+    args = parser.parse_args()
+    args.run(args)
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,7 @@ from cryptography.hazmat.primitives import kdf
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives import hashes
 
-from biometric_core import Fingerprint, Minutia
+from biometric_core import Fingerprint
 from geometric_quantizer import GeometricQuantizer
 from secure_mask import SecureMask
 
@@ -18,40 +18,112 @@ class BioCrypt:
     
 import hmac
 import hashlib
-from typing import List, Tuple
+import time
+from typing import Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
 from collections import Counter
+from dataclasses import dataclass
+import numpy as np
 from cryptography.hazmat.primitives import kdf
 from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives import hashes
 
-from biometric_core import Fingerprint, Minutia
+from biometric_core import Fingerprint
 from geometric_quantizer import GeometricQuantizer
-from secure_mask import SecureMask
+from secure_mask import SecureMask, SectorCache
 from ecc_wrapper import FuzzyCommitment
+from instrumentation import StageTrace, NULL_TRACE
+from record_format import BinaryRecord, as_record, as_records
+
+if TYPE_CHECKING:
+    from enrollment_store import EnrollmentStore
+
+@dataclass
+class GridSweep:
+    """
+    Lattice of grid shifts tried around the stored helper_grid (opt-in, see BioCrypt.authenticate).
+    Shifts are k * step for k in [-steps, steps]; the defaults (a 3x3 lattice) reach a quarter
+    bucket each way.
+    Every extra candidate is one more unlock attempt, so FAR grows roughly with `max_attempts`
+    (see `benchmark.py sweep`): keep the lattice small.
+    """
+    steps_d: int = 1
+    steps_theta: int = 1
+    step_d: float = 12.5       # pixels (delta_d / 4)
+    step_theta: float = 30.0   # degrees (delta_theta / 4)
+    max_attempts: int = 9
+
+    def offsets(self, offset_d: float, offset_theta: float, delta_d: float, delta_theta: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns: (offset_d, offset_theta) arrays, most likely first.
+        Likelihood is the shift length measured in buckets; the stored grid itself comes first.
+        """
+        shifts = [(i, j) for i in range(-self.steps_d, self.steps_d + 1)
+                         for j in range(-self.steps_theta, self.steps_theta + 1)]
+        shifts.sort(key=lambda s: ((s[0] * self.step_d / delta_d) ** 2 + (s[1] * self.step_theta / delta_theta) ** 2,
+                                   abs(s[0]), abs(s[1])))
+        off_d = np.array([offset_d + i * self.step_d for i, _ in shifts], dtype=np.float64)
+        off_t = np.array([offset_theta + j * self.step_theta for _, j in shifts], dtype=np.float64)
+        return off_d, off_t
+
+class VectorVote:
+    """
+    Running per-byte majority vote over feature vectors.
+    Votes are counted in arrival order, so majority() after any prefix of scans equals
+    what enroll() would vote from that prefix (ties go to the earliest byte value).
+    """
+
+    def __init__(self, length: int = 8):
+        self.length = length
+        self.columns = [Counter() for _ in range(length)]
+        self.count = 0
+
+    def add(self, vector: bytes):
+        if len(vector) != self.length:
+            raise ValueError(f"Feature vector length {len(vector)} != {self.length} (too few anchors)")
+        for column, byte in zip(self.columns, vector):
+            column[byte] += 1
+        self.count += 1
+
+    def majority(self) -> bytes:
+        return bytes(column.most_common(1)[0][0] for column in self.columns)
+
+    def is_decisive(self) -> bool:
+        """True when every byte's winner leads by 2+ votes, so one more dissenting scan cannot overtake it."""
+        for column in self.columns:
+            top = column.most_common(2)
+            if len(top) == 2 and top[0][1] - top[1][1] < 2:
+                return False
+        return self.count > 0
 
 class BioCrypt:
     """
     Main Orchestrator V4 (ECC-Enabled).
     Uses Fuzzy Commitment Scheme with Reed-Solomon.
+    Stateless after construction: grid offsets travel with each call, inputs are not
+    modified, so one instance can serve many threads (see `benchmark.py threads`).
     """
     
-    def __init__(self, user_seed_hex: str):
+    def __init__(self, user_seed_hex: str, sector_cache: SectorCache = None):
+        """
+        sector_cache: LRU for SecureMask sectors (defaults to the process-wide cache).
+        Pass SectorCache(maxsize=0) to always re-derive.
+        """
         self.user_seed = bytes.fromhex(user_seed_hex)
+        self.sector_cache = sector_cache
         self.quantizer = GeometricQuantizer()
-        self.helper_data_offsets = {'offset_d': 0.0, 'offset_theta': 0.0}
         # ECC Parameter: N=8 (vector len). Secret=4 bytes. Parity=4 bytes.
         self.fcs = FuzzyCommitment(secret_size=4, parity_bytes=4)
 
-    def _get_bio_vector(self, fp: Fingerprint, service_name: str, use_offsets: bool = False) -> bytes:
-        mask = SecureMask(self.user_seed, service_name)
-        anchors = mask.select_anchors(fp)
-        
-        off_d = self.helper_data_offsets['offset_d'] if use_offsets else 0.0
-        off_t = self.helper_data_offsets['offset_theta'] if use_offsets else 0.0
-        
-        return self.quantizer.compute_feature_bytes(anchors, off_d, off_t)
+    def _mask(self, service_name: str) -> SecureMask:
+        return SecureMask.from_cache(self.user_seed, service_name, self.sector_cache)
 
-    def enroll(self, reference_fps: List[Fingerprint], service_name: str) -> dict:
+    def _get_bio_vector(self, fp: Fingerprint, service_name: str, offsets: dict = None) -> bytes:
+        """offsets: a record's helper_grid; None for the canonical (0, 0) enrollment grid."""
+        anchors = self._mask(service_name).select_anchors(fp)
+        offsets = offsets or {'offset_d': 0.0, 'offset_theta': 0.0}
+        return self.quantizer.compute_feature_bytes(anchors, offsets['offset_d'], offsets['offset_theta'])
+
+    def enroll(self, reference_fps: List[Fingerprint], service_name: str, trace: StageTrace = None) -> dict:
         """
         Enrollment V4:
         1. Determine optimal Grid Offsets (Adaptive Grid).
@@ -59,6 +131,7 @@ class BioCrypt:
         3. Generate Random Secret S.
         4. Commit: Helper = RS(S) XOR B.
         Returns: Public Enrollment Record { 'helper_ecc': bytes, 'helper_grid': dict, 'secret_hash': bytes }
+        trace: optional StageTrace (mask, anchors_quantize, vote, rs_encode, verifier).
         """
         # 1. Consensus / Grid Alignment (Simplified: Use Scan #0 as pivot)
         # Using the majority vote vector from V3 is still good practice to reduce initial error.
@@ -78,7 +151,10 @@ class BioCrypt:
         # But we need to store the grid used for enrollment. 
         # Let's assume (0,0) for enrollment.
         
-        mask = SecureMask(self.user_seed, service_name) # Common mask
+        trace = trace or NULL_TRACE
+        trace.start()
+        mask = self._mask(service_name) # Common mask
+        trace.mark('mask')
         
         # Get all raw byte vectors
         vectors = []
@@ -86,21 +162,24 @@ class BioCrypt:
             anchors = mask.select_anchors(fp)
             b = self.quantizer.compute_feature_bytes(anchors, 0.0, 0.0)
             vectors.append(b)
+        trace.mark('anchors_quantize', scans=len(reference_fps))
             
         # Per-byte majority vote
-        stable_bytes = []
-        for i in range(8): # Length 8
-            col = [v[i] for v in vectors]
-            mode = Counter(col).most_common(1)[0][0]
-            stable_bytes.append(mode)
-        
-        golden_vector = bytes(stable_bytes)
-        
+        vote = VectorVote(self.fcs.codeword_len)
+        for v in vectors:
+            vote.add(v)
+        golden_vector = vote.majority()
+        trace.mark('vote')
+        return self._commit(golden_vector, service_name, trace)
+
+    def _commit(self, golden_vector: bytes, service_name: str, trace=NULL_TRACE) -> dict:
         # 2. Commit
         secret, ecc_helper = self.fcs.commit(golden_vector)
+        trace.mark('rs_encode')
         
         # 3. Hash the secret
         secret_hash = hashlib.sha256(secret).hexdigest()
+        trace.mark('verifier')
         
         return {
             'helper_ecc': ecc_helper.hex(),
@@ -109,14 +188,68 @@ class BioCrypt:
             'verifier': secret_hash
         }
 
-    def authenticate(self, live_fp: Fingerprint, service_name: str, enrollment_record: dict) -> str:
+    def enroll_stream(self, scans: Iterable[Fingerprint], service_name: str, min_scans: int = 3,
+                      stable_scans: int = 2, max_scans: int = None) -> dict:
+        """
+        Streaming enrollment over a burst of scans (consumed lazily, one at a time).
+        1. Quantize each scan and add it to a running per-byte vote (scans with too few anchors are skipped).
+        2. Stop once at least `min_scans` were voted, the majority vector has not changed for
+           `stable_scans` scans and no byte is close to a tie (or at `max_scans` / end of stream).
+        3. Commit the voted vector, exactly as enroll() would for the scans seen.
+        Returns: { 'record': enrollment record, 'scans': consumed, 'used': voted,
+                   'stable': bool, 'time_to_decision_ms': float }
+        """
+        t0 = time.perf_counter()
+        vote = VectorVote(self.fcs.codeword_len)
+        consumed = 0
+        unchanged = 0
+        previous = None
+        stable = False
+        for fp in scans:
+            consumed += 1
+            vector = self._get_bio_vector(fp, service_name)
+            if len(vector) == vote.length:
+                vote.add(vector)
+                current = vote.majority()
+                unchanged = unchanged + 1 if current == previous else 1
+                previous = current
+                if vote.count >= min_scans and unchanged >= stable_scans and vote.is_decisive():
+                    stable = True
+                    break
+            if max_scans is not None and consumed >= max_scans:
+                break
+        if vote.count == 0:
+            raise ValueError(f"No usable scan among {consumed} (too few anchors).")
+            
+        record = self._commit(vote.majority(), service_name)
+        return {
+            'record': record,
+            'scans': consumed,
+            'used': vote.count,
+            'stable': stable,
+            'time_to_decision_ms': (time.perf_counter() - t0) * 1000,
+        }
+
+    def authenticate(self, live_fp: Fingerprint, service_name: str, enrollment_record: Union[dict, BinaryRecord],
+                     sweep: GridSweep = None,
+                     trace: StageTrace = None) -> str:
         """
         Auth V4:
         1. Get Live Vector B'.
         2. Unlock: S' = Unlock(B', Helper).
         3. Verify Hash(S') == Record.verifier.
         4. If success, Perform KDF(S') -> Final Key.
+        enrollment_record: enroll() dict, or its binary encoding (record_format.pack_record).
+        sweep: also try shifted grids when the stored one fails (see authenticate_sweep).
+        trace: optional StageTrace (mask, quantize, rs_decode, verify_kdf; with a sweep,
+            rs_decode / verify_kdf repeat per attempt).
         """
+        if sweep is not None:
+            return self.authenticate_sweep(live_fp, service_name, enrollment_record, sweep, trace)['key']
+        
+        trace = trace or NULL_TRACE
+        trace.start()
+        enrollment_record = as_record(enrollment_record)
         # Validate Context Binding
         ctx_hash = hashlib.sha256(service_name.encode()).hexdigest()
         if enrollment_record.get('context_hash') != ctx_hash:
@@ -125,21 +258,290 @@ class BioCrypt:
         # 1. Get Live Vector
         # (Apply stored grid offsets)
         offsets = enrollment_record['helper_grid']
-        self.helper_data_offsets = offsets
-        live_vector = self._get_bio_vector(live_fp, service_name, use_offsets=True)
+        anchors = self._mask(service_name).select_anchors(live_fp)
+        trace.mark('mask', anchors=len(anchors))
+        live_vector = self.quantizer.compute_feature_bytes(anchors, offsets['offset_d'], offsets['offset_theta'])
+        trace.mark('quantize')
         
         # 2. Unlock
         helper_bytes = bytes.fromhex(enrollment_record['helper_ecc'])
+        try:
+            secret = self.fcs.unlock(live_vector, helper_bytes)
+        except Exception:
+            trace.mark('rs_decode', corrected=False)
+            return None # Failed correction
+        trace.mark('rs_decode', corrected=True)
+            
+        key = self._verify_and_derive(secret, service_name, enrollment_record)
+        trace.mark('verify_kdf', verified=key is not None)
+        return key
+
+    def unlock_stream(self, scans: Iterable[Fingerprint], service_name: str, enrollment_record: Union[dict, BinaryRecord],
+                      max_scans: int = None, vote_after: int = 3) -> dict:
+        """
+        Streaming unlock over a burst of scans (consumed lazily, one at a time).
+        Each scan is tried on its own; from `vote_after` scans on, the running per-byte vote of
+        all scans so far is tried as well (it cancels noise that no single scan gets past).
+        Stops at the first unlock, at `max_scans`, or at the end of the stream.
+        Returns: { 'key': hex or None, 'scans': consumed, 'attempts': unlock attempts,
+                   'via': 'scan' | 'vote' | None, 'time_to_decision_ms': float }
+        """
+        t0 = time.perf_counter()
+        enrollment_record = as_record(enrollment_record)
+        self._check_contexts(service_name, [enrollment_record])
+        grid = enrollment_record['helper_grid']
+        helper_bytes = bytes.fromhex(enrollment_record['helper_ecc'])
+        
+        vote = VectorVote(self.fcs.codeword_len)
+        consumed = 0
+        attempts = 0
+        key = None
+        via = None
+        tried = set()
+        for fp in scans:
+            consumed += 1
+            vector = self._get_bio_vector(fp, service_name, grid)
+            if len(vector) == vote.length:
+                vote.add(vector)
+                candidates = [('scan', vector)]
+                if vote.count >= vote_after:
+                    candidates.append(('vote', vote.majority()))
+                for source, candidate in candidates:
+                    if candidate in tried:
+                        continue # Same vector already failed
+                    tried.add(candidate)
+                    attempts += 1
+                    key = self._unlock_vector(candidate, helper_bytes, service_name, enrollment_record)
+                    if key:
+                        via = source
+                        break
+            if key or (max_scans is not None and consumed >= max_scans):
+                break
+                
+        return {
+            'key': key,
+            'scans': consumed,
+            'attempts': attempts,
+            'via': via,
+            'time_to_decision_ms': (time.perf_counter() - t0) * 1000,
+        }
+
+    def _unlock_vector(self, live_vector: bytes, helper_bytes: bytes, service_name: str,
+                       enrollment_record: dict) -> Optional[str]:
         try:
             secret = self.fcs.unlock(live_vector, helper_bytes)
         except Exception:
             return None # Failed correction
+        return self._verify_and_derive(secret, service_name, enrollment_record)
+
+    def authenticate_sweep(self, live_fp: Fingerprint, service_name: str, enrollment_record: Union[dict, BinaryRecord],
+                           sweep: GridSweep = None, trace: StageTrace = None) -> dict:
+        """
+        Authenticate with a multi-offset grid sweep, for scans that land on a bucket boundary.
+        1. Quantize the anchors on every lattice offset in one vectorized pass.
+        2. Drop candidates whose vector repeats an earlier (more likely) one.
+        3. Unlock candidates in order; stop at the first verifier match.
+        Each candidate is a separate unlock attempt, so an impostor gets up to max_attempts
+        chances instead of one: FAR rises with the lattice size. In a 300-user simulation at
+        noise 4 (`benchmark.py sweep`), impostor accepts rose ~1.6x with the 9-attempt default
+        and ~1.9x with a 25-attempt lattice. Only pass a sweep where that trade is acceptable.
+        trace: optional StageTrace: mask, quantize (all candidates), then rs_decode and, when
+            it corrects, verify_kdf for each attempt (numbered by `attempt`).
+        Returns: { 'key': hex or None, 'attempts': int, 'candidates': int,
+                   'offset': matching helper_grid or None, 'timings_ms': {'quantize', 'unlock', 'total'} }
+        """
+        sweep = sweep or GridSweep()
+        trace = trace or NULL_TRACE
+        trace.start()
+        t0 = time.perf_counter()
+        enrollment_record = as_record(enrollment_record)
+        
+        ctx_hash = hashlib.sha256(service_name.encode()).hexdigest()
+        if enrollment_record.get('context_hash') != ctx_hash:
+            raise ValueError("Context Mismatch! Replay Attack Detected.")
+        
+        # 1. Candidate vectors
+        grid = enrollment_record['helper_grid']
+        off_d, off_t = sweep.offsets(grid['offset_d'], grid['offset_theta'],
+                                     self.quantizer.delta_d, self.quantizer.delta_theta)
+        anchors = self._mask(service_name).select_anchors(live_fp)
+        trace.mark('mask', anchors=len(anchors))
+        xy = np.stack([anchors['x'], anchors['y']], axis=-1).astype(np.float64)
+        vectors = self.quantizer.compute_feature_bytes_batch(np.broadcast_to(xy, (len(off_d),) + xy.shape), off_d, off_t)
+        
+        # 2. Dedupe, keeping likelihood order
+        candidates = {}
+        for i, row in enumerate(vectors):
+            candidates.setdefault(row.tobytes(), i)
+        trace.mark('quantize', candidates=len(candidates))
+        t1 = time.perf_counter()
+        
+        # 3. Unlock in order
+        key = None
+        offset = None
+        attempts = 0
+        try:
+            helper_bytes = bytes.fromhex(enrollment_record['helper_ecc'])
+        except ValueError:
+            helper_bytes = b"" # Malformed helper -> every attempt fails
+        for live_vector, i in candidates.items():
+            if attempts >= sweep.max_attempts:
+                break
+            attempts += 1
+            try:
+                secret = self.fcs.unlock(live_vector, helper_bytes)
+            except Exception:
+                trace.mark('rs_decode', corrected=False, attempt=attempts)
+                continue # Failed correction
+            trace.mark('rs_decode', corrected=True, attempt=attempts)
+            key = self._verify_and_derive(secret, service_name, enrollment_record)
+            trace.mark('verify_kdf', verified=key is not None, attempt=attempts)
+            if key:
+                offset = {'offset_d': float(off_d[i]), 'offset_theta': float(off_t[i])}
+                break
+        t2 = time.perf_counter()
+        
+        return {
+            'key': key,
+            'attempts': attempts,
+            'candidates': len(candidates),
+            'offset': offset,
+            'timings_ms': {
+                'quantize': (t1 - t0) * 1000,
+                'unlock': (t2 - t1) * 1000,
+                'total': (t2 - t0) * 1000,
+            },
+        }
+
+    def authenticate_many(self, live_fp: Fingerprint, service_name: str, records) -> List[Optional[str]]:
+        """
+        1:N variant of authenticate: one live scan against many enrollment records
+        (dicts or binary records, a packed record set, or a RECORD_DTYPE array).
+        The mask and anchors are derived once, the live vector once per distinct grid,
+        then all helpers are unlocked in one batch.
+        Returns: Hex Key (or None) per record, in order.
+        """
+        records = as_records(records)
+        self._check_contexts(service_name, records)
+        
+        mask = self._mask(service_name)
+        anchors = mask.select_anchors(live_fp)
+        
+        vectors_by_grid = {}
+        live_vectors = []
+        for record in records:
+            grid = record['helper_grid']
+            key = (grid['offset_d'], grid['offset_theta'])
+            if key not in vectors_by_grid:
+                vectors_by_grid[key] = self.quantizer.compute_feature_bytes(anchors, *key)
+            live_vectors.append(vectors_by_grid[key])
+            
+        return self._unlock_batch(live_vectors, service_name, records)
+
+    def authenticate_pairs(self, live_fps: List[Fingerprint], service_name: str, records) -> List[Optional[str]]:
+        """
+        Bulk re-verification: live_fps[i] is checked against records[i].
+        The mask is derived once for the whole batch.
+        records: in any format authenticate_many accepts.
+        Returns: Hex Key (or None) per pair, in order.
+        """
+        records = as_records(records)
+        if len(live_fps) != len(records):
+            raise ValueError("Size mismatch")
+        self._check_contexts(service_name, records)
+        
+        mask = self._mask(service_name)
+        live_vectors = []
+        for fp, record in zip(live_fps, records):
+            grid = record['helper_grid']
+            anchors = mask.select_anchors(fp)
+            live_vectors.append(self.quantizer.compute_feature_bytes(anchors, grid['offset_d'], grid['offset_theta']))
+            
+        return self._unlock_batch(live_vectors, service_name, records)
+
+    def identify(self, live_fp: Fingerprint, service_name: str, store: 'EnrollmentStore') -> dict:
+        """
+        1:N identification against every record of `service_name` in an EnrollmentStore.
+        1. Look up the service's rows through the store's context_hash index.
+        2. Quantize the live anchors once per distinct helper_grid.
+        3. XOR against all helper columns and RS-decode them in one batch.
+        4. Hash the decoded secrets and compare with the verifier column.
+        Returns: { 'matches': [{'row': int, 'key': hex}], 'records': rows swept, 'decoded': RS successes,
+                   'timings_ms': {'lookup', 'unlock', 'verify', 'total'} }
+        """
+        t0 = time.perf_counter()
+        
+        # 1. Candidate rows (copied out of the memmap, columns only)
+        rows = store.rows_for_context(hashlib.sha256(service_name.encode()).digest())
+        records = store.records[rows]
+        t1 = time.perf_counter()
+        
+        # 2. Live vector per grid (enrollments all use (0, 0) today, so usually one)
+        anchors = self._mask(service_name).select_anchors(live_fp)
+        grids = np.stack([records['offset_d'], records['offset_theta']], axis=-1)
+        if len(grids) and np.all(grids == grids[0]):
+            unique_grids, grid_of_row = grids[:1], np.zeros(len(grids), dtype=np.intp) # Skip the row sort
+        else:
+            unique_grids, grid_of_row = np.unique(grids, axis=0, return_inverse=True)
+        live = [self.quantizer.compute_feature_bytes(anchors, d, t) for d, t in unique_grids.tolist()]
+        matches = []
+        decoded = 0
+        if len(rows) and len(live[0]) == self.fcs.codeword_len:
+            live_vectors = np.frombuffer(b"".join(live), dtype=np.uint8).reshape(len(live), -1)
             
+            # 3. Batch unlock
+            secrets, ok = self.fcs.unlock_arrays(live_vectors[grid_of_row.ravel()], records['helper_ecc'])
+            t2 = time.perf_counter()
+            
+            # 4. Verify the (few) decoded candidates
+            hits = np.flatnonzero(ok)
+            decoded = len(hits)
+            for i in hits.tolist():
+                secret = secrets[i].tobytes()
+                if hashlib.sha256(secret).digest() == records['verifier'][i].tobytes():
+                    matches.append({'row': int(rows[i]), 'key': self._derive_key(secret, service_name)})
+        else:
+            t2 = time.perf_counter() # Too few anchors: nothing can decode
+        t3 = time.perf_counter()
+        
+        return {
+            'matches': matches,
+            'records': len(rows),
+            'decoded': decoded,
+            'timings_ms': {
+                'lookup': (t1 - t0) * 1000,
+                'unlock': (t2 - t1) * 1000,
+                'verify': (t3 - t2) * 1000,
+                'total': (t3 - t0) * 1000,
+            },
+        }
+
+    def _check_contexts(self, service_name: str, records: List[dict]):
+        ctx_hash = hashlib.sha256(service_name.encode()).hexdigest()
+        for i, record in enumerate(records):
+            if record.get('context_hash') != ctx_hash:
+                raise ValueError(f"Context Mismatch in record {i}! Replay Attack Detected.")
+
+    def _unlock_batch(self, live_vectors: List[bytes], service_name: str, records: List[dict]) -> List[Optional[str]]:
+        helpers = []
+        for record in records:
+            try:
+                helpers.append(bytes.fromhex(record['helper_ecc']))
+            except ValueError:
+                helpers.append(b"") # Malformed helper -> fails like a bad unlock
+                
+        secrets = self.fcs.unlock_many(live_vectors, helpers)
+        return [None if secret is None else self._verify_and_derive(secret, service_name, record)
+                for secret, record in zip(secrets, records)]
+
+    def _verify_and_derive(self, secret: bytes, service_name: str, enrollment_record: dict) -> Optional[str]:
         # 3. Verify
         secret_hash = hashlib.sha256(secret).hexdigest()
         if secret_hash != enrollment_record['verifier']:
             return None # Hash mismatch (should be caught by RS error usually, but safety net)
-            
+        return self._derive_key(secret, service_name)
+
+    def _derive_key(self, secret: bytes, service_name: str) -> str:
         # 4. Derive Final Key (HKDF)
         # S is 4 bytes (random). Stretch it.
         hkdf = HKDF(
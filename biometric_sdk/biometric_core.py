@@ -2,6 +2,7 @@ import random
 import math
 from typing import List, Tuple
 from dataclasses import dataclass
+import numpy as np
 
 @dataclass
 class Minutia:
@@ -15,50 +16,103 @@ class Minutia:
     def distance_to(self, x: float, y: float) -> float:
         return math.sqrt((self.x - x)**2 + (self.y - y)**2)
 
+# Compact minutiae layout: one row per point, type stored as a uint8 code.
+# Coordinates stay float64 so feature bytes are bit-identical to the Minutia path.
+MINUTIA_TYPES = ('ridge_ending', 'bifurcation')
+MINUTIA_DTYPE = np.dtype([
+    ('id', np.int32),
+    ('x', np.float64),
+    ('y', np.float64),
+    ('angle', np.float64),
+    ('type', np.uint8),
+])
+_TYPE_CODES = {name: code for code, name in enumerate(MINUTIA_TYPES)}
+
+def minutiae_to_array(minutiae: List[Minutia]) -> np.ndarray:
+    """List[Minutia] -> structured array (MINUTIA_DTYPE)."""
+    try:
+        rows = [(m.id, m.x, m.y, m.angle, _TYPE_CODES[m.type]) for m in minutiae]
+    except KeyError as e:
+        raise ValueError(f"Unknown minutia type: {e.args[0]}")
+    return np.array(rows, dtype=MINUTIA_DTYPE)
+
+def array_to_minutiae(points: np.ndarray) -> List[Minutia]:
+    """Structured array (MINUTIA_DTYPE) -> List[Minutia]."""
+    return [Minutia(id=i, x=x, y=y, angle=angle, type=MINUTIA_TYPES[t])
+            for i, x, y, angle, t in zip(points['id'].tolist(), points['x'].tolist(),
+                                         points['y'].tolist(), points['angle'].tolist(),
+                                         points['type'].tolist())]
+
 class Fingerprint:
-    """Simulates a user's fingerprint containing a set of minutiae."""
-    
+    """
+    Simulates a user's fingerprint containing a set of minutiae.
+    Minutiae are stored in `points` (MINUTIA_DTYPE array); `minutiae` is a read-only tuple view.
+    """
+
     def __init__(self, seed: int = None, num_minutiae: int = 40):
         # Using a seed ensures we can recreate the "Same User" perfectly
         self.rng = random.Random(seed)
-        self.minutiae: List[Minutia] = []
-        
+
         # Biometric Space: 500x500 normalized units
+        rows = []
         for i in range(num_minutiae):
-            m = Minutia(
-                id=i,
-                x=self.rng.uniform(0, 500),
-                y=self.rng.uniform(0, 500),
-                angle=self.rng.uniform(0, 360),
-                type=self.rng.choice(['ridge_ending', 'bifurcation'])
-            )
-            self.minutiae.append(m)
-
-    def scan(self, noise_level: float = 0.0) -> 'Fingerprint':
+            x = self.rng.uniform(0, 500)
+            y = self.rng.uniform(0, 500)
+            angle = self.rng.uniform(0, 360)
+            m_type = self.rng.choice(['ridge_ending', 'bifurcation'])
+            rows.append((i, x, y, angle, _TYPE_CODES[m_type]))
+        self.points = np.array(rows, dtype=MINUTIA_DTYPE)
+
+    @classmethod
+    def from_array(cls, points: np.ndarray) -> 'Fingerprint':
+        fp = cls(seed=None, num_minutiae=0)
+        fp.points = np.asarray(points, dtype=MINUTIA_DTYPE)
+        return fp
+
+    @classmethod
+    def from_minutiae(cls, minutiae: List[Minutia]) -> 'Fingerprint':
+        return cls.from_array(minutiae_to_array(minutiae))
+
+    def to_minutiae(self) -> List[Minutia]:
+        return array_to_minutiae(self.points)
+
+    @property
+    def minutiae(self) -> Tuple[Minutia, ...]:
+        """
+        Minutiae built from `points`, as a tuple so that the old in-place edits
+        (fp.minutiae.append(m), fp.minutiae[i] = m) raise instead of silently changing a copy.
+        To edit: m = fp.to_minutiae(); ...; fp.minutiae = m. Changing a Minutia's fields in
+        place does not reach `points` either.
+        """
+        return tuple(self.to_minutiae())
+
+    @minutiae.setter
+    def minutiae(self, minutiae: List[Minutia]):
+        self.points = minutiae_to_array(minutiae)
+
+    def __len__(self):
+        return len(self.points)
+
+    def scan(self, noise_level: float = 0.0, rng: random.Random = None) -> 'Fingerprint':
         """
         Simulates scanning the fingerprint.
         noise_level: Magnitude of jitter (positional shift) in pixels.
+        rng: random.Random for reproducible scans (defaults to the global `random` module).
         """
-        scanned_fp = Fingerprint(seed=None, num_minutiae=0)
-        
-        for m in self.minutiae:
+        rng = rng or random
+        rows = []
+
+        for m_id, x, y, angle, m_type in self.points.tolist():
             # Add Gaussian noise
-            noise_x = random.gauss(0, noise_level)
-            noise_y = random.gauss(0, noise_level)
-            noise_angle = random.gauss(0, noise_level * 2) # Angle is more volatile
-            
+            noise_x = rng.gauss(0, noise_level)
+            noise_y = rng.gauss(0, noise_level)
+            noise_angle = rng.gauss(0, noise_level * 2) # Angle is more volatile
+
             # Simulate occasional dropout/missing point (98% capture rate)
-            if random.random() > 0.02: 
-                new_m = Minutia(
-                    id=m.id,
-                    x=m.x + noise_x,
-                    y=m.y + noise_y,
-                    angle=(m.angle + noise_angle) % 360,
-                    type=m.type
-                )
-                scanned_fp.minutiae.append(new_m)
-                
-        return scanned_fp
+            if rng.random() > 0.02:
+                rows.append((m_id, x + noise_x, y + noise_y, (angle + noise_angle) % 360, m_type))
+
+        return Fingerprint.from_array(np.array(rows, dtype=MINUTIA_DTYPE))
 
     def __repr__(self):
-        return f"<Fingerprint with {len(self.minutiae)} minutiae>"
+        return f"<Fingerprint with {len(self.points)} minutiae>"
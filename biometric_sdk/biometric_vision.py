@@ -3,7 +3,330 @@ import numpy as np
 from skimage.morphology import skeletonize
 from skimage import img_as_bool
 import math
-from biometric_core import Minutia
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import List, Tuple, Union
+from biometric_core import Minutia, MINUTIA_DTYPE, array_to_minutiae
+from instrumentation import StageTrace, NULL_TRACE
+from template_cache import TemplateCache
+
+# Part of every template cache key: bump when a change to the pipeline alters its output
+PIPELINE_VERSION = 2
+
+# 8-neighbour offsets (dy, dx), in crossing-number order P2..P9
+NEIGHBOURS = [(-1, -1), (-1, 0), (-1, 1),
+              (0, 1), (1, 1), (1, 0),
+              (1, -1), (0, -1)]
+
+def _build_neighbourhood_luts():
+    """
+    Precomputes, for every 8-bit neighbourhood code (bit i = neighbour i set):
+    - the Crossing Number CN = 0.5 * sum(|P_i - P_{i+1}|)
+    - the ending angle (direction of the first set neighbour, in degrees)
+    """
+    cn_lut = np.zeros(256, dtype=np.uint8)
+    angle_lut = np.zeros(256, dtype=np.float64)
+    for code in range(256):
+        values = [(code >> i) & 1 for i in range(8)]
+        crossings = 0
+        for i in range(8):
+            crossings += abs(values[i] - values[(i+1)%8])
+        cn_lut[code] = crossings // 2
+        for i, (dy, dx) in enumerate(NEIGHBOURS):
+            if values[i] == 1:
+                angle_lut[code] = math.degrees(math.atan2(dy, dx))
+                break
+    return cn_lut, angle_lut
+
+CN_LUT, ENDING_ANGLE_LUT = _build_neighbourhood_luts()
+
+def _build_zhang_suen_luts():
+    """
+    Zhang-Suen deletion tables, indexed by the same 8-bit neighbourhood code.
+    A ridge pixel is deleted when 2 <= B <= 6 and A == 1 (B: set neighbours,
+    A: 0->1 transitions around P2..P9) and
+    - first sub-iteration:  P2*P4*P6 == 0 and P4*P6*P8 == 0
+    - second sub-iteration: P2*P4*P8 == 0 and P2*P6*P8 == 0
+    """
+    first = np.zeros(256, dtype=np.uint8)
+    second = np.zeros(256, dtype=np.uint8)
+    for code in range(256):
+        values = [(code >> i) & 1 for i in range(8)]
+        # NEIGHBOURS starts at the top-left pixel (P9); rotate to P2..P9
+        p2, p3, p4, p5, p6, p7, p8, p9 = values[1:] + values[:1]
+        ring = [p2, p3, p4, p5, p6, p7, p8, p9]
+        b = sum(ring)
+        a = sum(1 for i in range(8) if ring[i] == 0 and ring[(i+1)%8] == 1)
+        if 2 <= b <= 6 and a == 1:
+            first[code] = p2 * p4 * p6 == 0 and p4 * p6 * p8 == 0
+            second[code] = p2 * p4 * p8 == 0 and p2 * p6 * p8 == 0
+    return first, second
+
+ZHANG_SUEN_LUTS = _build_zhang_suen_luts()
+
+# Correlating a 0/1 image with these weights yields each pixel's neighbourhood code
+_NEIGHBOUR_WEIGHTS = np.zeros((3, 3), dtype=np.float32)
+for _i, (_dy, _dx) in enumerate(NEIGHBOURS):
+    _NEIGHBOUR_WEIGHTS[1 + _dy, 1 + _dx] = 1 << _i
+
+def _skeleton_skimage(bin_img: np.ndarray) -> np.ndarray:
+    # Scikit-image implies True (white) = Ridge
+    bool_img = img_as_bool(bin_img)
+    skeleton = skeletonize(bool_img)
+    return skeleton.astype(np.uint8) * 1 # 0 or 1
+
+def _skeleton_zhang_suen(bin_img: np.ndarray) -> np.ndarray:
+    """
+    Whole-image Zhang-Suen thinning: every sub-iteration is one filter2D (neighbourhood
+    codes) plus one LUT, instead of a per-pixel loop. Stops after two idle sub-iterations.
+    """
+    skeleton = (bin_img != 0).astype(np.uint8)
+    sub_iteration = 0
+    idle = 0
+    while idle < 2:
+        codes = cv2.filter2D(skeleton, -1, _NEIGHBOUR_WEIGHTS, borderType=cv2.BORDER_CONSTANT)
+        deleted = cv2.LUT(codes, ZHANG_SUEN_LUTS[sub_iteration])
+        deleted &= skeleton
+        sub_iteration ^= 1
+        if cv2.countNonZero(deleted):
+            skeleton -= deleted
+            idle = 0
+        else:
+            idle += 1
+    return skeleton
+
+def _ximgproc_thinning(thinning_type_name: str):
+    def thin(bin_img: np.ndarray) -> np.ndarray:
+        thinning_type = getattr(cv2.ximgproc, thinning_type_name)
+        return (cv2.ximgproc.thinning(bin_img, thinningType=thinning_type) != 0).astype(np.uint8)
+    return thin
+
+# Skeletonization backends: binary ridge image (0/255) -> 0/1 uint8 skeleton.
+# 'skimage' is the reference (and what existing enrollments were made with); the others
+# are faster but do not produce identical skeletons - see `benchmark.py skeleton`.
+SKELETON_BACKENDS = {
+    'skimage': _skeleton_skimage,
+    'zhang-suen': _skeleton_zhang_suen,
+    # Need opencv-contrib-python
+    'opencv-zhangsuen': _ximgproc_thinning('THINNING_ZHANGSUEN'),
+    'opencv-guohall': _ximgproc_thinning('THINNING_GUOHALL'),
+}
+
+# How minutia angles are measured (coordinates are identical in both modes)
+ANGLE_MODES = ('orientation', 'neighbour')
+
+def orientation_field(img: np.ndarray, block: int = 16) -> np.ndarray:
+    """
+    Block-wise ridge orientation of a grayscale image, in degrees [0, 180) (image axes, y down).
+    Sobel gradients are squared into doubled-angle vectors (so opposite gradients across a ridge
+    reinforce instead of cancelling), averaged per cell, smoothed over neighbouring cells,
+    and turned 90 degrees: ridges run across the dominant gradient.
+    `block` sets the cell count, not an exact tile: the image is area-resized to
+    ceil(rows / block) x ceil(cols / block) cells, so a cell spans rows / ceil(rows / block)
+    pixels (<= block; fractional cell edges are area-weighted). Look cells up by proportional
+    scaling (r * cells // rows), not r // block.
+    Returns: (ceil(rows / block), ceil(cols / block)) float64 array.
+    """
+    gx = cv2.Sobel(img, cv2.CV_32F, 1, 0, ksize=3)
+    gy = cv2.Sobel(img, cv2.CV_32F, 0, 1, ksize=3)
+    size = (max(1, -(-img.shape[1] // block)), max(1, -(-img.shape[0] // block)))
+    # INTER_AREA averages the pixels under each cell (rows / cells of them, weighted at fractional edges)
+    vx = cv2.resize(2 * gx * gy, size, interpolation=cv2.INTER_AREA)
+    vy = cv2.resize(gx * gx - gy * gy, size, interpolation=cv2.INTER_AREA)
+    vx = cv2.GaussianBlur(vx, (3, 3), 0)
+    vy = cv2.GaussianBlur(vy, (3, 3), 0)
+    gradient = 0.5 * np.degrees(np.arctan2(vx, vy).astype(np.float64))
+    return np.mod(gradient + 90.0, 180.0)
+
+def available_skeleton_backends() -> List[str]:
+    return [name for name in SKELETON_BACKENDS
+            if not name.startswith('opencv-') or hasattr(cv2, 'ximgproc')]
+
+# A filesystem path, encoded image bytes (PNG/JPEG/...), or a decoded image array
+ImageInput = Union[str, bytes, bytearray, memoryview, np.ndarray]
+
+def load_gray(image: ImageInput) -> np.ndarray:
+    """
+    Any ImageInput -> 8-bit grayscale array, without a disk round trip for in-memory input.
+    Color arrays are taken as BGR (OpenCV order).
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim == 3:
+            code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            image = cv2.cvtColor(image, code)
+        if image.ndim != 2:
+            raise ValueError(f"Unsupported image shape: {image.shape}")
+        if image.dtype != np.uint8:
+            raise ValueError(f"Unsupported image dtype: {image.dtype} (expected uint8)")
+        return image
+    
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        img = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise ValueError("Cannot decode image bytes")
+        return img
+    
+    img = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise FileNotFoundError(f"Cannot load image: {image}")
+    return img
+
+# QualityGate reason codes, in the order the checks run
+QUALITY_LOW_CONTRAST = 'low_contrast'
+QUALITY_BLURRY = 'blurry'
+QUALITY_PARTIAL = 'partial'
+QUALITY_REASONS = (QUALITY_LOW_CONTRAST, QUALITY_BLURRY, QUALITY_PARTIAL)
+
+class QualityError(ValueError):
+    """An image rejected by a QualityGate. `reason` is one of QUALITY_REASONS; `metrics` is the assessment."""
+
+    def __init__(self, reason: str, metrics: dict):
+        super().__init__(f"Image rejected by quality gate: {reason} "
+                         f"(contrast {metrics['contrast']:.0f}, focus {metrics['focus']:.2f}, "
+                         f"coverage {metrics['coverage']:.2f})")
+        self.reason = reason
+        self.metrics = metrics
+
+    def __reduce__(self):
+        # args holds only the message; rebuild from the fields so process-pool rejects unpickle
+        return (QualityError, (self.reason, self.metrics))
+
+@dataclass
+class QualityGate:
+    """
+    Cheap pre-extraction check (see RealFingerprintExtractor quality_gate), run on a copy
+    downsampled to at most `side` px:
+    - contrast: 2nd-98th percentile gray spread of the ridge blocks, or of the whole frame
+      when there are none (blank, washed-out or dark frames)
+    - focus: Laplacian energy / intensity variance over the ridge blocks; sharp ridges score
+      ~3, defocus or motion blur drops towards 0. Independent of exposure.
+    - coverage: fraction of `block` px blocks whose std >= block_std (finger area in frame)
+    A few ms per image against tens for extraction. Also counts what it rejected and
+    estimates the extraction time that saved (see stats).
+    """
+    min_contrast: float = 40.0
+    min_focus: float = 0.3
+    min_coverage: float = 0.25
+    side: int = 256
+    block: int = 8
+    block_std: float = 8.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _stats: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._reset()
+
+    def __getstate__(self):
+        # Process-pool workers get the thresholds and fresh counters
+        return self.thresholds()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._stats = {'checked': 0, 'rejected': Counter(), 'gate_ms': 0.0,
+                       'extracted': 0, 'extract_ms': 0.0}
+
+    def thresholds(self) -> dict:
+        """Settings that decide what passes (template cache key material)."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+
+    def assess(self, img: np.ndarray) -> dict:
+        """
+        img: 8-bit grayscale array (see load_gray).
+        Returns: {'ok', 'reason' (None or a QUALITY_REASONS code), 'contrast', 'focus', 'coverage', 'ms'}
+        """
+        t0 = time.perf_counter()
+        # 1. Downsample: every metric is a block statistic, so full resolution buys nothing
+        scale = self.side / max(img.shape)
+        if scale < 1.0:
+            size = (max(1, round(img.shape[1] * scale)), max(1, round(img.shape[0] * scale)))
+            img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+        
+        # 2. Block variance (coverage) and Laplacian energy (focus); INTER_AREA averages each block
+        b = self.block
+        hb, wb = img.shape[0] // b, img.shape[1] // b
+        crop = img[:hb * b, :wb * b]
+        mask = None
+        focus = coverage = 0.0
+        if hb and wb:
+            gray = crop.astype(np.float32)
+            mean = cv2.resize(gray, (wb, hb), interpolation=cv2.INTER_AREA)
+            var = cv2.resize(gray * gray, (wb, hb), interpolation=cv2.INTER_AREA) - mean * mean
+            ridge = var >= self.block_std ** 2
+            coverage = float(ridge.mean())
+            if ridge.any():
+                lap = cv2.Laplacian(gray, cv2.CV_32F)
+                energy = cv2.resize(lap * lap, (wb, hb), interpolation=cv2.INTER_AREA)
+                focus = float(energy[ridge].sum() / var[ridge].sum())
+                # A small finger on a flat background is partial, not low contrast
+                mask = cv2.resize(ridge.astype(np.uint8), (wb * b, hb * b), interpolation=cv2.INTER_NEAREST)
+        
+        # 3. Contrast (of the finger, when there is one)
+        hist = cv2.calcHist([crop if mask is not None else img], [0], mask, [256], [0, 256]).ravel().cumsum()
+        lo, hi = np.searchsorted(hist, (0.02 * hist[-1], 0.98 * hist[-1]))
+        contrast = float(hi - lo)
+        
+        # 4. Checks, cheapest signal first
+        reason = None
+        if contrast < self.min_contrast:
+            reason = QUALITY_LOW_CONTRAST
+        elif focus < self.min_focus:
+            reason = QUALITY_BLURRY
+        elif coverage < self.min_coverage:
+            reason = QUALITY_PARTIAL
+        return {'ok': reason is None, 'reason': reason, 'contrast': contrast, 'focus': focus,
+                'coverage': coverage, 'ms': (time.perf_counter() - t0) * 1000}
+
+    def check(self, img: np.ndarray) -> dict:
+        """assess, counted in stats. Raises QualityError on a reject. Returns: the assessment."""
+        result = self.assess(img)
+        with self._lock:
+            self._stats['checked'] += 1
+            self._stats['gate_ms'] += result['ms']
+            if not result['ok']:
+                self._stats['rejected'][result['reason']] += 1
+        if not result['ok']:
+            raise QualityError(result['reason'], result)
+        return result
+
+    def record_extraction(self, ms: float):
+        """Extraction time of an image that passed (the basis of the saved_ms estimate)."""
+        with self._lock:
+            self._stats['extracted'] += 1
+            self._stats['extract_ms'] += ms
+
+    def stats(self) -> dict:
+        """
+        Returns: checked / passed / rejected counts (with a per-reason breakdown), reject_rate,
+        mean gate and extraction ms, and saved_ms = rejected * mean extraction ms (estimate:
+        rejects would not have taken exactly as long as the images that passed).
+        Only counts checks made in this process: process-pool workers gate with their own
+        copy (see __getstate__), whose counters never reach this one.
+        """
+        with self._lock:
+            s = self._stats
+            rejected = sum(s['rejected'].values())
+            extract_ms = s['extract_ms'] / s['extracted'] if s['extracted'] else 0.0
+            return {
+                'checked': s['checked'],
+                'passed': s['checked'] - rejected,
+                'rejected': rejected,
+                'reasons': {reason: s['rejected'][reason] for reason in QUALITY_REASONS},
+                'reject_rate': rejected / s['checked'] if s['checked'] else 0.0,
+                'gate_ms': s['gate_ms'] / s['checked'] if s['checked'] else 0.0,
+                'extract_ms': extract_ms,
+                'saved_ms': rejected * extract_ms,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._reset()
 
 class RealFingerprintExtractor:
     """
@@ -11,113 +334,308 @@ class RealFingerprintExtractor:
     Pipeline: Gray -> Contrast -> Binary -> Skeleton -> Minutiae.
     """
     
-    def __init__(self, normalized_size=(500, 500)):
+    def __init__(self, normalized_size=(500, 500), skeleton_backend: str = 'skimage',
+                 roi_crop: bool = False, roi_block: int = 16, roi_ratio: float = 0.35,
+                 template_cache: TemplateCache = None, angle_mode: str = 'orientation',
+                 orientation_block: int = 16, quality_gate: QualityGate = None):
+        """
+        skeleton_backend: one of SKELETON_BACKENDS ('skimage' by default).
+        roi_crop: segment the fingerprint first (block variance), enhance only its bounding
+            region and drop minutiae in background blocks. Opt-in: CLAHE tiles follow the
+            crop, so minutiae differ from full-frame extraction.
+        roi_block: block size (px) of the foreground mask.
+        roi_ratio: a block is foreground if its std >= roi_ratio * (95th percentile block std).
+        template_cache: optional TemplateCache; repeated images (same bytes or array, same
+            options) return the cached minutiae instead of running the pipeline again.
+        angle_mode: 'orientation' (default) reads angles from the ridge orientation field, for
+            endings and bifurcations; 'neighbour' keeps the old skeleton-neighbour direction
+            (endings only, bifurcations 0.0). Angles do not enter the key, so both modes unlock
+            the same records.
+        orientation_block: nominal cell size (px) of the orientation field (see orientation_field).
+        quality_gate: optional QualityGate, run on every decoded image; a reject raises
+            QualityError (a ValueError with a reason code) before the pipeline starts.
+        """
+        if skeleton_backend not in SKELETON_BACKENDS:
+            raise ValueError(f"Unknown skeleton backend: {skeleton_backend} "
+                             f"(expected one of {', '.join(SKELETON_BACKENDS)})")
+        if skeleton_backend not in available_skeleton_backends():
+            raise ValueError(f"Skeleton backend {skeleton_backend} needs cv2.ximgproc (opencv-contrib-python)")
+        if angle_mode not in ANGLE_MODES:
+            raise ValueError(f"Unknown angle mode: {angle_mode} (expected one of {', '.join(ANGLE_MODES)})")
         self.target_size = normalized_size
+        self.skeleton_backend = skeleton_backend
+        self.roi_crop = roi_crop
+        self.roi_block = roi_block
+        self.roi_ratio = roi_ratio
+        self.template_cache = template_cache
+        self.angle_mode = angle_mode
+        self.orientation_block = orientation_block
+        self.quality_gate = quality_gate
+
+    def cache_params(self) -> dict:
+        """Options that change the extracted minutiae (template cache key material)."""
+        params = {
+            'version': PIPELINE_VERSION,
+            'normalized_size': list(self.target_size),
+            'skeleton_backend': self.skeleton_backend,
+            'roi_crop': self.roi_crop,
+            'roi_block': self.roi_block,
+            'roi_ratio': self.roi_ratio,
+            'angle_mode': self.angle_mode,
+            'orientation_block': self.orientation_block,
+        }
+        # A cached template implies the image passed: only reuse it under the same gate
+        if self.quality_gate is not None:
+            params['quality_gate'] = self.quality_gate.thresholds()
+        return params
+
+    def extract(self, image: ImageInput, trace: StageTrace = None) -> list[Minutia]:
+        """
+        image: path, encoded bytes or grayscale ndarray (see load_gray).
+        trace: optional StageTrace, receives one mark per pipeline stage.
+        """
+        return array_to_minutiae(self.extract_points(image, trace))
 
-    def extract(self, image_path: str) -> list[Minutia]:
+    def extract_points(self, image: ImageInput, trace: StageTrace = None) -> np.ndarray:
+        """Same as extract, as a compact MINUTIA_DTYPE array."""
+        trace = trace or NULL_TRACE
+        trace.start()
+        if self.template_cache is not None:
+            return self._extract_cached(image, trace)
         # 1. Load Image
-        img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if img is None:
-            raise FileNotFoundError(f"Cannot load image: {image_path}")
-            
+        img = load_gray(image)
+        trace.mark('load', pixels=img.size)
+        return self._extract_gated(img, trace)
+
+    def _extract_cached(self, image: ImageInput, trace) -> np.ndarray:
+        # Paths are read once and keyed by content, so a copied or re-uploaded file still hits
+        if isinstance(image, str):
+            try:
+                with open(image, 'rb') as f:
+                    image = f.read()
+            except OSError:
+                raise FileNotFoundError(f"Cannot load image: {image}")
+        key = self.template_cache.key(image, self.cache_params())
+        points = self.template_cache.get(key)
+        if points is not None:
+            trace.mark('cache_hit', minutiae=len(points))
+            return points
+
+        img = load_gray(image)
+        trace.mark('load', pixels=img.size)
+        points = self._extract_gated(img, trace)
+        self.template_cache.put(key, points)
+        return points
+
+    def extract_points_many(self, images: List[ImageInput], max_workers: int = None,
+                            use_processes: bool = False) -> Tuple[List[np.ndarray], List[float]]:
+        """
+        extract_points for several captures (any ImageInput) concurrently.
+        Threads are the default: the OpenCV and skeletonize stages release the GIL.
+        use_processes=True trades worker start-up for full CPU parallelism on large batches.
+        Returns: (points per image, extraction ms per image), both in input order.
+        """
+        images = list(images)
+        if len(images) <= 1:
+            results = [_timed_extract(self, image) for image in images]
+        else:
+            pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            with pool(max_workers=max_workers or min(len(images), 8)) as ex:
+                results = list(ex.map(_timed_extract, [self] * len(images), images))
+        return [points for points, _ in results], [ms for _, ms in results]
+
+    def foreground_blocks(self, img: np.ndarray) -> np.ndarray:
+        """
+        Block-variance segmentation: (rows // roi_block, cols // roi_block) bool mask,
+        True where the block holds ridges. Flat background has low variance whatever its level.
+        """
+        b = self.roi_block
+        hb, wb = img.shape[0] // b, img.shape[1] // b
+        if hb == 0 or wb == 0:
+            return np.ones((max(hb, 1), max(wb, 1)), dtype=bool)
+        blocks = img[:hb * b, :wb * b].reshape(hb, b, wb, b).astype(np.float32)
+        std = blocks.std(axis=(1, 3))
+        mask = (std >= self.roi_ratio * np.percentile(std, 95)).astype(np.uint8)
+        # Drop isolated noisy blocks, then fill pores inside the finger
+        kernel = np.ones((3, 3), np.uint8)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+        return mask.astype(bool)
+
+    def _roi_box(self, foreground: np.ndarray, shape) -> Tuple[int, int, int, int]:
+        """Bounding box (y0, y1, x0, x1) of the foreground blocks plus one block of margin, or None."""
+        rows, cols = np.nonzero(foreground)
+        if len(rows) == 0:
+            return None
+        b = self.roi_block
+        y0 = max((rows.min() - 1) * b, 0)
+        x0 = max((cols.min() - 1) * b, 0)
+        y1 = min((rows.max() + 2) * b, shape[0])
+        x1 = min((cols.max() + 2) * b, shape[1])
+        # Blocks only cover whole multiples of roi_block; keep the remainder strip if we touch it
+        if rows.max() + 1 == foreground.shape[0]:
+            y1 = shape[0]
+        if cols.max() + 1 == foreground.shape[1]:
+            x1 = shape[1]
+        return y0, y1, x0, x1
+
+    def _extract_gated(self, img: np.ndarray, trace: StageTrace = None) -> np.ndarray:
+        # 1a. Quality gate (optional): raises QualityError before any expensive stage
+        if self.quality_gate is None:
+            return self._extract_gray(img, trace)
+        trace = trace or NULL_TRACE
+        quality = self.quality_gate.check(img)
+        trace.mark('quality', focus=round(quality['focus'], 2), coverage=round(quality['coverage'], 2))
+        t0 = time.perf_counter()
+        points = self._extract_gray(img, trace)
+        self.quality_gate.record_extraction((time.perf_counter() - t0) * 1000)
+        return points
+
+    def _extract_gray(self, img: np.ndarray, trace: StageTrace = None) -> np.ndarray:
+        # Counts that cost a pass over the image are only taken when tracing
+        trace = trace or NULL_TRACE
+        
+        # 1b. Foreground ROI (opt-in): crop before the expensive stages
+        frame_shape = img.shape
+        origin = (0, 0)
+        foreground = None
+        if self.roi_crop:
+            foreground = self.foreground_blocks(img)
+            box = self._roi_box(foreground, img.shape)
+            if box is None:
+                trace.mark('roi', pixels=0)
+                return np.zeros(0, dtype=MINUTIA_DTYPE)
+            y0, y1, x0, x1 = box
+            img = np.ascontiguousarray(img[y0:y1, x0:x1])
+            origin = (y0, x0)
+            trace.mark('roi', pixels=img.size)
+        
         # 2. Preprocess (CLAHE + Gaussian)
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
         img = clahe.apply(img)
+        trace.mark('clahe', pixels=img.size)
         img = cv2.GaussianBlur(img, (5, 5), 0)
+        trace.mark('blur', pixels=img.size)
+        
+        orientation = None
+        if self.angle_mode == 'orientation':
+            orientation = orientation_field(img, self.orientation_block)
+            trace.mark('orientation', blocks=orientation.size)
         
         # 3. Binarize (Adaptive Threshold)
         # Inverted because we want ridges as white
         bin_img = cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
                                         cv2.THRESH_BINARY_INV, 11, 2)
+        if trace.enabled:
+            trace.mark('threshold', pixels=img.size, ridge_pixels=cv2.countNonZero(bin_img))
                                         
         # 4. Skeletonize
-        # Scikit-image implies True (white) = Ridge
-        bool_img = img_as_bool(bin_img)
-        skeleton = skeletonize(bool_img)
-        skeleton_uint8 = skeleton.astype(np.uint8) * 1 # 0 or 1
-        
-        # 5. Minutiae Extraction (Crossing Number)
-        # CN = 0.5 * sum(|P_i - P_{i+1}|)
-        # Enpoints: CN=1, Bifurcations: CN=3
-        
-        minutiae = []
-        rows, cols = skeleton_uint8.shape
+        skeleton_uint8 = SKELETON_BACKENDS[self.skeleton_backend](bin_img)
+        if trace.enabled:
+            trace.mark('skeletonize', backend=self.skeleton_backend, skeleton_pixels=cv2.countNonZero(skeleton_uint8))
         
-        # Define 8-neighbor offsets
-        neighbors = [(-1, -1), (-1, 0), (-1, 1),
-                     (0, 1), (1, 1), (1, 0),
-                     (1, -1), (0, -1)]
-                     
-        # Use simple kernel convolution approach for speed if possible, but loop is safer for logic
-        # Optimize loop by skipping borders
-        
-        count = 0
-        for r in range(1, rows - 1):
-            for c in range(1, cols - 1):
-                if skeleton_uint8[r, c] == 1:
-                    # Check neighborhood
-                    # Get values P2..P9 (in order)
-                    values = [int(skeleton_uint8[r+dy, c+dx]) for dy, dx in neighbors]
-                    
-                    # Calculate Crossing Number
-                    crossings = 0
-                    for i in range(8):
-                        crossings += abs(values[i] - values[(i+1)%8])
-                    cn = crossings // 2
-                    
-                    m_type = None
-                    if cn == 1:
-                        m_type = 'ridge_ending'
-                    elif cn == 3:
-                        m_type = 'bifurcation'
-                        
-                    if m_type:
-                        # Normalize coordinates to 500x500 target
-                        norm_x = (c / cols) * self.target_size[0]
-                        norm_y = (r / rows) * self.target_size[1]
-                        
-                        # Calculate Angle (Basic: Gradient of neighbors) -> To be robust, requires direction map
-                        # For PoC, use 0.0 or random if direction not implemented yet
-                        # Let's try to get tangent from neighbors for Endings
-                        angle = 0.0 
-                        if cn == 1:
-                            # Find the one neighbor
-                            for i, (dy, dx) in enumerate(neighbors):
-                                if values[i] == 1:
-                                    angle = math.degrees(math.atan2(dy, dx))
-                                    break
-                                    
-                        m = Minutia(
-                            id=count,
-                            x=norm_x,
-                            y=norm_y,
-                            angle=angle,
-                            type=m_type
-                        )
-                        minutiae.append(m)
-                        count += 1
+        # 5. Minutiae Extraction (Crossing Number), in full-frame coordinates
+        points = self._scan_minutiae(skeleton_uint8, origin, frame_shape, foreground, orientation)
+        trace.mark('crossing_number', minutiae=len(points))
                         
         # Filter spurious minutiae (too close to each other)
         # Simple Euclidean filter
-        final_minutiae = self._filter_minutiae(minutiae)
-        return final_minutiae
+        points = self._filter_minutiae(points)
+        trace.mark('filter', minutiae=len(points))
+        return points
 
-    def _filter_minutiae(self, minutiae: list[Minutia], threshold=10.0) -> list[Minutia]:
-        # Sort by quality (or just position) 
+    def _scan_minutiae(self, skeleton: np.ndarray, origin=(0, 0), frame_shape=None,
+                       foreground: np.ndarray = None, orientation: np.ndarray = None) -> np.ndarray:
+        """
+        Crossing Number scan over the whole skeleton (0/1 uint8) in one pass.
+        Endings: CN=1, Bifurcations: CN=3.
+        Each interior pixel's 8 neighbours are packed into a byte code, which
+        indexes the CN and ending-angle lookup tables.
+        For a cropped skeleton, origin (y0, x0) and frame_shape place it in the full frame,
+        and minutiae outside the foreground blocks (see foreground_blocks) are dropped.
+        orientation: optional orientation_field of the skeleton's image; angles are then
+        looked up in it (one gather for all minutiae) instead of taken from the neighbour code.
+        """
+        rows, cols = skeleton.shape
+        frame_rows, frame_cols = frame_shape or (rows, cols)
+        if rows < 3 or cols < 3:
+            return np.zeros(0, dtype=MINUTIA_DTYPE)
+            
+        # Pack neighbourhoods of the interior (borders are skipped, as before)
+        codes = np.zeros((rows - 2, cols - 2), dtype=np.uint8)
+        for bit, (dy, dx) in enumerate(NEIGHBOURS):
+            codes |= skeleton[1+dy:rows-1+dy, 1+dx:cols-1+dx] << bit
+            
+        cn = CN_LUT[codes]
+        hits = (skeleton[1:-1, 1:-1] == 1) & ((cn == 1) | (cn == 3))
+        
+        # np.nonzero walks row-major, i.e. the same order as a (r, c) scan
+        r, c = np.nonzero(hits)
+        r += 1 + origin[0]
+        c += 1 + origin[1]
+        if foreground is not None:
+            b = self.roi_block
+            keep = foreground[np.minimum(r // b, foreground.shape[0] - 1),
+                              np.minimum(c // b, foreground.shape[1] - 1)]
+            r, c = r[keep], c[keep]
+        hit_cn = cn[r - 1 - origin[0], c - 1 - origin[1]]
+        hit_codes = codes[r - 1 - origin[0], c - 1 - origin[1]]
+        
+        points = np.zeros(len(r), dtype=MINUTIA_DTYPE)
+        points['id'] = np.arange(len(r))
+        # Normalize coordinates to 500x500 target
+        points['x'] = (c / frame_cols) * self.target_size[0]
+        points['y'] = (r / frame_rows) * self.target_size[1]
+        neighbour = ENDING_ANGLE_LUT[hit_codes]
+        if orientation is None:
+            # Endings point towards their single neighbour; bifurcations get 0.0
+            points['angle'] = np.where(hit_cn == 1, neighbour, 0.0)
+        else:
+            by = np.minimum((r - origin[0]) * orientation.shape[0] // rows, orientation.shape[0] - 1)
+            bx = np.minimum((c - origin[1]) * orientation.shape[1] // cols, orientation.shape[1] - 1)
+            theta = orientation[by, bx]
+            # Ridge orientation is only defined mod 180: endings take the sense that points
+            # along their ridge (closest to the neighbour direction); bifurcations keep [0, 180)
+            turn = np.abs((theta - neighbour + 180.0) % 360.0 - 180.0) > 90.0
+            points['angle'] = np.mod(np.where((hit_cn == 1) & turn, theta + 180.0, theta), 360.0)
+        # Type codes: 0 = ridge_ending (CN=1), 1 = bifurcation (CN=3)
+        points['type'] = hit_cn >> 1
+        return points
+
+    def _filter_minutiae(self, points: np.ndarray, threshold=10.0) -> np.ndarray:
         # Remove those too close to borders
-        # Remove clusters
-        valid = []
-        for m in minutiae:
-            # Border check (normalized 500x500)
-            if m.x < 20 or m.x > 480 or m.y < 20 or m.y > 480:
-                continue
-                
+        # Remove clusters: keep a point only if no already-kept point is closer than threshold
+        # Border check (normalized 500x500), all points at once
+        xs = points['x']
+        ys = points['y']
+        inside = np.flatnonzero((xs >= 20) & (xs <= 480) & (ys >= 20) & (ys <= 480))
+        if threshold <= 0:
+            return points[inside]
+            
+        # Uniform grid with threshold-sized cells: any kept point closer than
+        # threshold lies in the candidate's cell or one of its 8 neighbours.
+        grid = {}
+        kept = []
+        for i, x, y in zip(inside.tolist(), xs[inside].tolist(), ys[inside].tolist()):
+            gx = int(x // threshold)
+            gy = int(y // threshold)
             is_good = True
-            for existing in valid:
-                dist = math.sqrt((m.x - existing.x)**2 + (m.y - existing.y)**2)
-                if dist < threshold:
-                    is_good = False
+            for cell in ((gx + dx, gy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+                for ex, ey in grid.get(cell, ()):
+                    dist = math.sqrt((x - ex)**2 + (y - ey)**2)
+                    if dist < threshold:
+                        is_good = False
+                        break
+                if not is_good:
                     break
             if is_good:
-                valid.append(m)
-        return valid
+                kept.append(i)
+                grid.setdefault((gx, gy), []).append((x, y))
+        return points[np.array(kept, dtype=np.intp)]
+
+
+def _timed_extract(extractor: RealFingerprintExtractor, image: ImageInput) -> Tuple[np.ndarray, float]:
+    # Module level so ProcessPoolExecutor can pickle it
+    t0 = time.perf_counter()
+    points = extractor.extract_points(image)
+    return points, (time.perf_counter() - t0) * 1000
@@ -0,0 +1,212 @@
+"""
+Bulk minutiae extraction for stored sample images (quality audits, threshold tuning).
+Usage: python bulk_extract.py <directory | manifest.txt> --out templates/ [options]
+
+Images are spread over a process pool and written to NPZ shards in --out:
+    paths      (N,)   str      image path, relative to the input directory / manifest
+    status     (N,)   uint8    STATUS_OK / STATUS_UNREADABLE / STATUS_FAILED
+    error      (N,)   str      error message ('' when ok)
+    elapsed_ms (N,)   float32  extraction time
+    offsets    (N+1,) int64    image i owns points[offsets[i]:offsets[i+1]]
+    points     (M,)   MINUTIA_DTYPE
+    params     ()     str      extractor options plus pipeline_version (JSON)
+Shards are written atomically, so an interrupted run is resumed by running the same
+command again: paths already present in a shard are skipped.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from biometric_core import MINUTIA_DTYPE
+
+STATUS_OK = 0
+STATUS_UNREADABLE = 1
+STATUS_FAILED = 2
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.pgm')
+SHARD_PREFIX = 'shard-'
+
+def list_images(source: str) -> Tuple[str, List[str]]:
+    """
+    Directory -> every image below it; file -> manifest with one path per line ('#' comments).
+    Returns: (root, relative paths in a stable order)
+    """
+    if os.path.isdir(source):
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(source):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.relpath(os.path.join(dirpath, name), source))
+        return source, paths
+
+    with open(source) as f:
+        paths = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    return os.path.dirname(os.path.abspath(source)), paths
+
+def shard_files(out_dir: str) -> List[str]:
+    if not os.path.isdir(out_dir):
+        return []
+    return sorted(os.path.join(out_dir, name) for name in os.listdir(out_dir)
+                  if name.startswith(SHARD_PREFIX) and name.endswith('.npz'))
+
+def completed_paths(out_dir: str, retry_failed: bool = False) -> set:
+    """Paths already stored in a shard (only successful ones with retry_failed)."""
+    done = set()
+    for shard in shard_files(out_dir):
+        with np.load(shard) as data:
+            paths = data['paths'].tolist()
+            ok = data['status'] == STATUS_OK
+            done.update(p for p, good in zip(paths, ok.tolist()) if good or not retry_failed)
+    return done
+
+def check_params(out_dir: str, params: dict):
+    """Refuses to mix extractor options in one output directory."""
+    expected = json.dumps(params, sort_keys=True)
+    for shard in shard_files(out_dir):
+        with np.load(shard) as data:
+            if str(data['params']) != expected:
+                raise ValueError(f"{shard} was extracted with {data['params']}, not {expected}")
+
+def load_templates(out_dir: str) -> Dict[str, np.ndarray]:
+    """
+    Reads every shard back: path -> MINUTIA_DTYPE array, for successful images.
+    Later shards win, so retried images replace their failed entries.
+    """
+    templates = {}
+    for shard in shard_files(out_dir):
+        with np.load(shard) as data:
+            offsets = data['offsets']
+            points = data['points']
+            for i, (path, status) in enumerate(zip(data['paths'].tolist(), data['status'].tolist())):
+                if status == STATUS_OK:
+                    templates[path] = points[offsets[i]:offsets[i + 1]]
+    return templates
+
+def write_shard(out_dir: str, index: int, results: List[tuple], params: dict) -> str:
+    """results: (path, status, points, error, elapsed_ms) tuples. Written to a temp file, then renamed."""
+    counts = [len(points) for _, _, points, _, _ in results]
+    offsets = np.zeros(len(results) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    points = (np.concatenate([p for _, _, p, _, _ in results]) if results
+              else np.zeros(0, dtype=MINUTIA_DTYPE))
+
+    path = os.path.join(out_dir, f"{SHARD_PREFIX}{index:05d}.npz")
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(
+            f,
+            paths=np.array([r[0] for r in results], dtype=str),
+            status=np.array([r[1] for r in results], dtype=np.uint8),
+            error=np.array([r[3] for r in results], dtype=str),
+            elapsed_ms=np.array([r[4] for r in results], dtype=np.float32),
+            offsets=offsets,
+            points=points.astype(MINUTIA_DTYPE, copy=False),
+            params=np.array(json.dumps(params, sort_keys=True)),
+        )
+    os.replace(tmp, path)
+    return path
+
+# Per-process state, set by the pool initializer
+_worker_extractor = None
+_worker_root = None
+
+def _init_worker(root: str, params: dict):
+    global _worker_extractor, _worker_root
+    from biometric_vision import RealFingerprintExtractor
+    _worker_extractor = RealFingerprintExtractor(**params)
+    _worker_root = root
+
+def _extract_one(rel_path: str) -> tuple:
+    t0 = time.perf_counter()
+    try:
+        points = _worker_extractor.extract_points(os.path.join(_worker_root, rel_path))
+        status, error = STATUS_OK, ''
+    except FileNotFoundError as e:
+        points, status, error = np.zeros(0, dtype=MINUTIA_DTYPE), STATUS_UNREADABLE, str(e)
+    except Exception as e:
+        points, status, error = np.zeros(0, dtype=MINUTIA_DTYPE), STATUS_FAILED, f"{type(e).__name__}: {e}"
+    return rel_path, status, points, error, (time.perf_counter() - t0) * 1000
+
+def run(source: str, out_dir: str, params: dict, workers: int = None, chunksize: int = 16,
+        shard_size: int = 1000, retry_failed: bool = False, log=sys.stderr) -> dict:
+    """
+    Extracts every pending image of `source` into new shards under `out_dir`.
+    params: RealFingerprintExtractor options.
+    Returns: summary dict (counts, throughput, shards written).
+    """
+    from biometric_vision import PIPELINE_VERSION
+    # Shards record the pipeline version too: a resume after an upgrade must not mix templates
+    shard_params = {**params, 'pipeline_version': PIPELINE_VERSION}
+    os.makedirs(out_dir, exist_ok=True)
+    check_params(out_dir, shard_params)
+    root, paths = list_images(source)
+    done = completed_paths(out_dir, retry_failed)
+    pending = [p for p in paths if p not in done]
+    existing = shard_files(out_dir)
+    next_index = int(os.path.basename(existing[-1])[len(SHARD_PREFIX):-len('.npz')]) + 1 if existing else 0
+    print(f"{len(paths)} images, {len(paths) - len(pending)} already extracted, {len(pending)} to go", file=log)
+
+    t0 = time.perf_counter()
+    written = []
+    counts = {STATUS_OK: 0, STATUS_UNREADABLE: 0, STATUS_FAILED: 0}
+    buffer = []
+    if pending:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(root, params)) as pool:
+                # map() submits in chunks of `chunksize` paths, keeping IPC overhead per image small
+                for result in pool.map(_extract_one, pending, chunksize=chunksize):
+                    buffer.append(result)
+                    counts[result[1]] += 1
+                    if len(buffer) >= shard_size:
+                        written.append(write_shard(out_dir, next_index, buffer, shard_params))
+                        next_index += 1
+                        buffer = []
+                        print(f"  {sum(counts.values())}/{len(pending)}", file=log)
+        finally:
+            # Keep finished images, also on Ctrl-C, so the next run resumes after them
+            if buffer:
+                written.append(write_shard(out_dir, next_index, buffer, shard_params))
+    elapsed = time.perf_counter() - t0
+
+    processed = sum(counts.values())
+    return {
+        'images': len(paths),
+        'skipped': len(paths) - len(pending),
+        'processed': processed,
+        'ok': counts[STATUS_OK],
+        'unreadable': counts[STATUS_UNREADABLE],
+        'failed': counts[STATUS_FAILED],
+        'elapsed_s': elapsed,
+        'images_per_s': processed / elapsed if elapsed > 0 else 0.0,
+        'shards': written,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='BioLock SDK bulk minutiae extraction')
+    parser.add_argument('source', help='Image directory (walked recursively) or manifest file (one path per line)')
+    parser.add_argument('--out', required=True, help='Output directory for NPZ shards')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=16, help='Images per task sent to a worker')
+    parser.add_argument('--shard-size', type=int, default=1000, help='Images per output shard')
+    parser.add_argument('--retry-failed', action='store_true', help='Re-extract images whose earlier attempt failed')
+    parser.add_argument('--skeleton-backend', default='skimage', help='RealFingerprintExtractor skeleton backend')
+    parser.add_argument('--roi-crop', action='store_true', help='Enable foreground ROI cropping')
+    parser.add_argument('--angle-mode', default='orientation', help="Minutia angles: 'orientation' or 'neighbour'")
+    args = parser.parse_args()
+
+    params = {'skeleton_backend': args.skeleton_backend, 'roi_crop': args.roi_crop, 'angle_mode': args.angle_mode}
+    summary = run(args.source, args.out, params, args.workers, args.chunksize, args.shard_size, args.retry_failed)
+    print(json.dumps(summary))
+
+if __name__ == '__main__':
+    main()
@@ -1,89 +1,225 @@
 import argparse
+import base64
 import json
 import sys
 import os
-import cv2
-import numpy as np
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add current directory to path so imports work
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from bio_crypt import BioCrypt
-    from biometric_core import Fingerprint, Minutia
+    from biometric_core import Fingerprint
+    from instrumentation import StageTrace, NULL_TRACE
+    from record_format import pack_record
 except ImportError as e:
     print(json.dumps({"success": False, "error": f"Import Error: {str(e)}"}))
     sys.exit(1)
 
-def load_image(image_path):
-    if not os.path.exists(image_path):
-        raise FileNotFoundError(f"Image not found: {image_path}")
-    return cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-
-# Mock minutiae extraction (since we might not have a full REAL fingerprint extractor linked yet)
-# In production, this would call `biometric_vision.extract_minutiae(img)`
-def mock_extract_minutiae(image_path):
-    # Deterministic mock based on file hash or content for testing consistency
-    # Real implementation should allow this to be swapped with `biometric_vision`
-    img = load_image(image_path)
-    if img is None:
-        raise ValueError("Failed to load image")
-        
-    # Generate pseudo-random minutiae based on image content
-    h, w = img.shape
-    seed = np.sum(img)
-    np.random.seed(int(seed) % 2**32)
-    
-    minutiae = []
-    for _ in range(20): # 20 minutiae points
-        x = np.random.randint(0, w)
-        y = np.random.randint(0, h)
-        angle = np.random.uniform(0, 2 * np.pi)
-        minutiae.append(Minutia(x, y, angle, type='bifurcation'))
-        
-    return Fingerprint(minutiae)
+# Defaulting to a fixed test seed if not provided (ONLY FOR DEV/DEMO)
+DEV_SEED = "0102030405060708090a0b0c0d0e0f100102030405060708090a0b0c0d0e0f10"
+MIN_MINUTIAE = 8
+
+# Loaded once per process on first use; in serve mode it is shared by every request.
+# cv2/skimage are only imported then, so worker startup stays cheap.
+_extractor = None
+# Set by --quality-gate: unusable captures are rejected before extraction
+_use_quality_gate = False
+
+def get_extractor():
+    global _extractor
+    if _extractor is None:
+        from biometric_vision import RealFingerprintExtractor, QualityGate
+        _extractor = RealFingerprintExtractor(quality_gate=QualityGate() if _use_quality_gate else None)
+    return _extractor
+
+def extract_fingerprint(image, trace=None):
+    """
+    image: file path, or encoded image bytes (decoded in memory, no temp file).
+    Decode and quality gate are the library's (RealFingerprintExtractor.extract_points).
+    """
+    trace = trace or NULL_TRACE
+    trace.start()
+    extractor = get_extractor() # First call imports cv2/skimage
+    trace.mark('init')
+    points = extractor.extract_points(image, trace)
+    if len(points) < MIN_MINUTIAE:
+        raise ValueError(f"Image quality too low. Found {len(points)} features, need {MIN_MINUTIAE}.")
+
+    return Fingerprint.from_array(points)
+
+def extract_fingerprints(images, max_workers=None, traces=None):
+    """
+    extract_fingerprint for several captures concurrently (OpenCV/skimage release the GIL).
+    traces: optional StageTrace per image.
+    Returns: (fingerprints, extraction ms per image), in input order.
+    """
+    def timed(image, trace):
+        t0 = time.perf_counter()
+        fp = extract_fingerprint(image, trace)
+        return fp, (time.perf_counter() - t0) * 1000
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(len(images), 8)) as ex:
+        results = list(ex.map(timed, images, traces or [None] * len(images)))
+    return [fp for fp, _ in results], [ms for _, ms in results]
+
+def warm_up(image_path=None):
+    """
+    Runs every pipeline stage once (CLAHE, skeletonize, RS, HKDF) so lazy
+    library initialisation is paid before the first real request.
+    """
+    if image_path:
+        img = image_path
+    else:
+        # Small synthetic ridge pattern (~9 px period plus sensor noise, so it also clears --quality-gate)
+        import numpy as np
+        xx = np.arange(128, dtype=np.float64)
+        ridges = 127 + 100 * np.sin(xx[None, :] / 1.5 + xx[:, None] / 7.0)
+        img = np.clip(ridges + np.random.default_rng(0).normal(0, 12, ridges.shape), 0, 255).astype(np.uint8)
+    get_extractor().extract_points(img)
+
+    bio = BioCrypt(user_seed_hex=DEV_SEED)
+    fp = Fingerprint(seed=0)
+    record = bio.enroll([fp], "warmup")
+    bio.authenticate(fp.scan(), "warmup", record)
+
+def handle_request(req: dict) -> dict:
+    """
+    Executes one request: {"action": "enroll"|"verify"|"warmup", "image", "service", "record", "secret"}.
+    "image" may be a list of paths for enroll (multi-scan majority vote).
+    "image_b64" (base64 string or list) carries the image bytes inline instead of a path.
+    "trace": true adds per-stage timings and counts to the response.
+    "record_format": "binary" makes enroll return "record_b64" (record_format encoding) instead of "record";
+    verify accepts either "record" or "record_b64".
+    """
+    action = req.get('action')
+    if action == 'warmup':
+        warm_up(req.get('image'))
+        return {"success": True}
+
+    if action not in ('enroll', 'verify'):
+        raise ValueError(f"Unknown action: {action}")
+    if req.get('image_b64'):
+        encoded = req['image_b64']
+        image = [base64.b64decode(e) for e in encoded] if isinstance(encoded, list) else base64.b64decode(encoded)
+    else:
+        image = req.get('image')
+    if not image:
+        raise ValueError("Image is required")
+
+    # For this PoC, we need a secret to initialize BioCrypt.
+    # In a real app, this might come from a secure enclave or key store.
+    user_seed = req.get('secret') or DEV_SEED
+    service = req.get('service') or 'SehatiApp'
+
+    bio = BioCrypt(user_seed_hex=user_seed)
+    images = image if isinstance(image, list) else [image]
+    if action == 'verify' and len(images) != 1:
+        raise ValueError("Verify takes exactly one image")
+
+    # One trace per image (extracted concurrently) plus one for the crypto stages
+    traces = [StageTrace() for _ in images] if req.get('trace') else None
+    crypto_trace = StageTrace() if traces else None
+
+    if action == 'enroll':
+        # Enroll accepts a LIST of reference fingerprints (usually 3-5)
+        fps, timings = extract_fingerprints(images, traces=traces)
+        record = bio.enroll(fps, service, trace=crypto_trace)
+        if req.get('record_format') == 'binary':
+            response = {"success": True, "record_b64": base64.b64encode(pack_record(record)).decode('ascii'),
+                        "timings_ms": timings}
+        else:
+            response = {"success": True, "record": record, "timings_ms": timings}
+    else:
+        fp = extract_fingerprint(images[0], traces[0] if traces else None)
+
+        record = req.get('record')
+        if req.get('record_b64'):
+            record = base64.b64decode(req['record_b64'])
+        if not record:
+            raise ValueError("Record is required for verification")
+        if isinstance(record, str):
+            record = json.loads(record)
+
+        key = bio.authenticate(fp, service, record, trace=crypto_trace)
+        if key:
+            response = {"success": True, "key": key}
+        else:
+            response = {"success": False, "error": "Authentication failed (Bio mismatch)"}
+
+    if traces:
+        response['trace'] = {
+            'extract': [t.to_dict() for t in traces],
+            'crypto': crypto_trace.to_dict(),
+        }
+    return response
+
+def error_response(e: Exception) -> dict:
+    response = {"success": False, "error": str(e)}
+    # Quality gate rejects carry a reason code (low_contrast, blurry, partial) for the client
+    if getattr(e, 'reason', None):
+        response['reason'] = e.reason
+    return response
+
+def serve(stdin, stdout):
+    """
+    Worker mode: one JSON request per input line, one JSON response per output line.
+    Responses echo the request's "id" so callers can pipeline requests.
+    """
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        req_id = None
+        try:
+            req = json.loads(line)
+            req_id = req.get('id')
+            response = handle_request(req)
+        except Exception as e:
+            response = error_response(e)
+        response['id'] = req_id
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
 
 def main():
     parser = argparse.ArgumentParser(description='BioLock SDK CLI Wrapper')
-    parser.add_argument('--action', required=True, choices=['enroll', 'verify'], help='Action to perform')
-    parser.add_argument('--image', required=True, help='Path to input image')
+    parser.add_argument('--action', required=True, choices=['enroll', 'verify', 'serve'], help='Action to perform')
+    parser.add_argument('--image', action='append', help="Path to input image, or '-' to read it from stdin (repeat for multi-scan enroll)")
     parser.add_argument('--service', default='SehatiApp', help='Service/Context name')
     parser.add_argument('--record', help='JSON string of enrollment record (for verify)')
     parser.add_argument('--secret', help='User secret/seed (hex) for enrollment')
+    parser.add_argument('--trace', action='store_true', help='Include per-stage timings and counts in the output')
+    parser.add_argument('--quality-gate', action='store_true',
+                        help='Reject blank, blurred or partial captures before extraction (adds a "reason" to the error)')
 
     args = parser.parse_args()
+    global _use_quality_gate
+    _use_quality_gate = args.quality_gate
+
+    if args.action == 'serve':
+        serve(sys.stdin, sys.stdout)
+        return
 
     try:
-        # For this PoC, we need a secret to initialize BioCrypt. 
-        # In a real app, this might come from a secure enclave or key store.
-        # Defaulting to a fixed test seed if not provided (ONLY FOR DEV/DEMO)
-        user_seed = args.secret if args.secret else "0102030405060708090a0b0c0d0e0f100102030405060708090a0b0c0d0e0f10"
-        
-        bio = BioCrypt(user_seed_hex=user_seed)
-        
-        # Extract features (Using mock for now until vision module is fully confirmed)
-        fp = mock_extract_minutiae(args.image)
-        
-        if args.action == 'enroll':
-            # Enroll accepts a LIST of reference fingerprints (usually 3-5)
-            # Here we just pass 1 for simplicity
-            record = bio.enroll([fp], args.service)
-            print(json.dumps({"success": True, "record": record}))
-            
-        elif args.action == 'verify':
-            if not args.record:
-                raise ValueError("Record is required for verification")
-                
-            record_dict = json.loads(args.record)
-            key = bio.authenticate(fp, args.service, record_dict)
-            
-            if key:
-                print(json.dumps({"success": True, "key": key}))
-            else:
-                print(json.dumps({"success": False, "error": "Authentication failed (Bio mismatch)"}))
+        if not args.image:
+            raise ValueError("--image is required for enroll/verify")
+        if args.image.count('-') > 1:
+            raise ValueError("Only one --image can be read from stdin")
+        images = [sys.stdin.buffer.read() if image == '-' else image for image in args.image]
+        result = handle_request({
+            'action': args.action,
+            'image': images,
+            'service': args.service,
+            'record': args.record,
+            'secret': args.secret,
+            'trace': args.trace,
+        })
+        print(json.dumps(result))
 
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        print(json.dumps(error_response(e)))
         sys.exit(1)
 
 if __name__ == '__main__':
@@ -1,6 +1,270 @@
-from reedsolo import RSCodec, ReedSolomonError
+from reedsolo import ReedSolomonError
 import os
 import hashlib
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# GF(2^8) tables for reedsolo's default field (prim=0x11d, generator=2).
+# GF_EXP is doubled so products of two logs need no modulo.
+GF_PRIM = 0x11d
+GF_EXP = [0] * 510
+GF_LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    GF_EXP[_i] = _x
+    GF_LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= GF_PRIM
+for _i in range(255, 510):
+    GF_EXP[_i] = GF_EXP[_i - 255]
+GF_EXP_NP = np.array(GF_EXP, dtype=np.uint8)
+GF_LOG_NP = np.array(GF_LOG, dtype=np.int64)
+# Full product / inverse tables for vectorized arithmetic (GF_INV_NP[0] is a placeholder 0)
+GF_MUL_NP = np.where(np.arange(256)[:, None] * np.arange(256)[None, :] != 0,
+                     GF_EXP_NP[GF_LOG_NP[:, None] + GF_LOG_NP[None, :]], 0).astype(np.uint8)
+GF_INV_NP = np.array([0] + [GF_EXP[255 - GF_LOG[x]] for x in range(1, 256)], dtype=np.uint8)
+
+def gf_mul(x: int, y: int) -> int:
+    if x == 0 or y == 0:
+        return 0
+    return GF_EXP[GF_LOG[x] + GF_LOG[y]]
+
+def gf_div(x: int, y: int) -> int:
+    if y == 0:
+        raise ZeroDivisionError()
+    if x == 0:
+        return 0
+    return GF_EXP[(GF_LOG[x] + 255 - GF_LOG[y]) % 255]
+
+def gf_inverse(x: int) -> int:
+    return GF_EXP[255 - GF_LOG[x]]
+
+def gf_pow(x: int, power: int) -> int:
+    return GF_EXP[(GF_LOG[x] * power) % 255]
+
+def gf_poly_add(p: List[int], q: List[int]) -> List[int]:
+    r = [0] * max(len(p), len(q))
+    r[len(r) - len(p):] = p
+    for i in range(len(q)):
+        r[i + len(r) - len(q)] ^= q[i]
+    return r
+
+def gf_poly_mul(p: List[int], q: List[int]) -> List[int]:
+    r = [0] * (len(p) + len(q) - 1)
+    for j, qj in enumerate(q):
+        if qj != 0:
+            for i, pi in enumerate(p):
+                if pi != 0:
+                    r[i + j] ^= GF_EXP[GF_LOG[pi] + GF_LOG[qj]]
+    return r
+
+def gf_poly_eval(poly: Sequence[int], x: int) -> int:
+    # Horner's scheme
+    y = poly[0]
+    for i in range(1, len(poly)):
+        y = gf_mul(y, x) ^ poly[i]
+    return y
+
+
+class SmallRSCodec:
+    """
+    Reed-Solomon codec for short fixed-size codewords (the SDK uses (8,4): 4 secret + 4 parity bytes).
+    Same field, generator and decoding steps as reedsolo.RSCodec(nsym), so encode/decode
+    outputs (and failures) match it, but:
+    - a zero syndrome returns immediately (the common "clean scan" case),
+    - decode_many computes syndromes for a whole batch of codewords with NumPy, and runs
+      Berlekamp-Massey + Chien search vectorized so only correctable words reach _correct.
+    Raises reedsolo.ReedSolomonError like RSCodec.
+    """
+
+    def __init__(self, nsym: int, msg_len: int, fcr: int = 0):
+        if msg_len + nsym > 255:
+            raise ValueError("Message is too long (%i when max is %i)" % (msg_len + nsym, 255))
+        self.nsym = nsym
+        self.msg_len = msg_len
+        self.n = msg_len + nsym
+        self.fcr = fcr
+
+        self.gen = [1]
+        for i in range(nsym):
+            self.gen = gf_poly_mul(self.gen, [1, gf_pow(2, i + fcr)])
+        self._lgen = [GF_LOG[g] for g in self.gen]
+        # log(alpha^((j+fcr) * (n-1-p))): syndrome j picks up byte p with this factor
+        self._synd_log = np.array([[((j + fcr) * (self.n - 1 - p)) % 255 for p in range(self.n)]
+                                   for j in range(nsym)], dtype=np.int64)
+
+    def encode(self, msg: bytes) -> bytes:
+        """Systematic encoding: msg + parity (extended synthetic division)."""
+        if len(msg) != self.msg_len:
+            raise ValueError(f"Message length {len(msg)} != {self.msg_len}")
+        out = list(msg) + [0] * self.nsym
+        for i in range(self.msg_len):
+            coef = out[i]
+            if coef != 0:
+                lcoef = GF_LOG[coef]
+                for j in range(1, len(self.gen)):
+                    out[i + j] ^= GF_EXP[lcoef + self._lgen[j]]
+        out[:self.msg_len] = msg
+        return bytes(out)
+
+    def syndromes(self, codeword: Sequence[int]) -> List[int]:
+        return [gf_poly_eval(codeword, gf_pow(2, i + self.fcr)) for i in range(self.nsym)]
+
+    def decode(self, codeword: bytes) -> bytes:
+        """Returns the corrected message (first msg_len bytes). Raises ReedSolomonError."""
+        if len(codeword) != self.n:
+            raise ValueError(f"Codeword length {len(codeword)} != {self.n}")
+        msg = list(codeword)
+        synd = self.syndromes(msg)
+        if max(synd) == 0:
+            return bytes(msg[:self.msg_len]) # no errors
+        return self._correct(msg, synd)
+
+    def syndromes_many(self, codewords: np.ndarray) -> np.ndarray:
+        """(N, n) uint8 codewords -> (N, nsym) uint8 syndromes."""
+        codewords = np.asarray(codewords, dtype=np.uint8)
+        # Column-wise: syndrome j += codeword[:, p] * alpha^(synd_log[j, p]), one table row per term
+        columns = [np.ascontiguousarray(codewords[:, p]) for p in range(codewords.shape[1])]
+        synd = np.zeros((len(codewords), self.nsym), dtype=np.uint8)
+        for j in range(self.nsym):
+            acc = np.zeros(len(codewords), dtype=np.uint8)
+            for p, column in enumerate(columns):
+                acc ^= GF_MUL_NP[GF_EXP[self._synd_log[j, p]]].take(column)
+            synd[:, j] = acc
+        return synd
+
+    def decode_many(self, codewords: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batch decode of (N, n) uint8 codewords.
+        Returns: (messages (N, msg_len) uint8, ok (N,) bool); rows with ok=False failed correction.
+        """
+        codewords = np.asarray(codewords, dtype=np.uint8).reshape(-1, self.n)
+        messages = codewords[:, :self.msg_len].copy()
+        ok = np.ones(len(codewords), dtype=bool)
+        if len(codewords) == 0:
+            return messages, ok
+
+        synd = self.syndromes_many(codewords)
+        dirty = np.flatnonzero(synd.any(axis=1))
+        # Words whose error locator has the wrong root count fail _correct at the same check
+        located = self.locate_many(synd[dirty])
+        ok[dirty[~located]] = False
+        dirty = dirty[located]
+        for i, word, word_synd in zip(dirty.tolist(), codewords[dirty].tolist(), synd[dirty].tolist()):
+            try:
+                messages[i] = list(self._correct(word, word_synd))
+            except ReedSolomonError:
+                ok[i] = False
+        return messages, ok
+
+    def locate_many(self, synd: np.ndarray) -> np.ndarray:
+        """
+        Berlekamp-Massey and Chien search of _correct, for (N, nsym) syndromes at once.
+        Returns: (N,) bool, False where _correct would raise before the Forney step.
+        """
+        synd = np.asarray(synd, dtype=np.uint8)
+        count = len(synd)
+        if count == 0:
+            return np.zeros(0, dtype=bool)
+        
+        # Polynomials are right-aligned (constant term in the last column), with explicit
+        # list lengths so the "len(old_loc) > len(err_loc)" swap matches the scalar code.
+        width = self.nsym + 2
+        err_loc = np.zeros((count, width), dtype=np.uint8)
+        old_loc = np.zeros((count, width), dtype=np.uint8)
+        err_loc[:, -1] = 1
+        old_loc[:, -1] = 1
+        err_len = np.ones(count, dtype=np.int16)
+        old_len = np.ones(count, dtype=np.int16)
+        
+        for k in range(self.nsym):
+            delta = synd[:, k].copy()
+            for j in range(1, width):
+                term = GF_MUL_NP[err_loc[:, -(j + 1)], synd[:, (k - j) % self.nsym]]
+                delta ^= np.where(j < err_len, term, 0).astype(np.uint8)
+            old_loc[:, :-1] = old_loc[:, 1:].copy()
+            old_loc[:, -1] = 0
+            old_len += 1
+            
+            # Whole-array updates (a zero delta multiplies to zero, so inactive rows keep err_loc)
+            active = delta != 0
+            swap = active & (old_len > err_len)
+            scaled_old = GF_MUL_NP[old_loc, delta[:, None]]
+            scaled_err = GF_MUL_NP[err_loc, GF_INV_NP[delta][:, None]]
+            err_loc = np.where(swap[:, None], scaled_old, err_loc)
+            old_loc = np.where(swap[:, None], scaled_err, old_loc)
+            err_len, old_len = np.where(swap, old_len, err_len), np.where(swap, err_len, old_len)
+            err_loc ^= GF_MUL_NP[old_loc, delta[:, None]]
+            err_len = np.where(active, np.maximum(err_len, old_len), err_len)
+            
+        # Degree after trimming leading zeros (the constant term is always 1)
+        errs = width - 1 - np.argmax(err_loc != 0, axis=1)
+        
+        # Chien search: rev_loc(alpha^i) = alpha^(i * errs) * err_loc(alpha^-i), so count
+        # the positions where err_loc(alpha^-i) vanishes (column c holds x^(width-1-c)).
+        columns = [np.ascontiguousarray(err_loc[:, col]) for col in range(width)]
+        roots = np.zeros(count, dtype=np.int16)
+        for i in range(self.n):
+            value = np.zeros(count, dtype=np.uint8)
+            for col in range(width):
+                value ^= GF_MUL_NP[GF_EXP[(-i * (width - 1 - col)) % 255]].take(columns[col])
+            roots += value == 0
+        return (errs * 2 <= self.nsym) & (roots == errs)
+
+    def _correct(self, msg: List[int], synd: List[int]) -> bytes:
+        # Berlekamp-Massey: error locator polynomial
+        err_loc = [1]
+        old_loc = [1]
+        for k in range(self.nsym):
+            delta = synd[k]
+            for j in range(1, len(err_loc)):
+                delta ^= gf_mul(err_loc[-(j + 1)], synd[k - j])
+            old_loc = old_loc + [0]
+            if delta != 0:
+                if len(old_loc) > len(err_loc):
+                    new_loc = [gf_mul(c, delta) for c in old_loc]
+                    old_loc = [gf_mul(c, gf_inverse(delta)) for c in err_loc]
+                    err_loc = new_loc
+                err_loc = gf_poly_add(err_loc, [gf_mul(c, delta) for c in old_loc])
+
+        while err_loc and err_loc[0] == 0:
+            err_loc = err_loc[1:]
+        errs = len(err_loc) - 1
+        if errs * 2 > self.nsym:
+            raise ReedSolomonError("Too many errors to correct")
+
+        # Chien search (restricted to the codeword's positions)
+        rev_loc = err_loc[::-1]
+        err_pos = [self.n - 1 - i for i in range(self.n) if gf_poly_eval(rev_loc, gf_pow(2, i)) == 0]
+        if len(err_pos) != errs:
+            raise ReedSolomonError("Too many (or few) errors found by Chien Search for the errata locator polynomial!")
+
+        # Forney: error magnitudes
+        coef_pos = [self.n - 1 - p for p in err_pos]
+        loc = [1]
+        for c in coef_pos:
+            loc = gf_poly_mul(loc, [gf_pow(2, c), 1])
+        full_synd = [0] + synd
+        err_eval = gf_poly_mul(full_synd[::-1], loc)[-len(loc):][::-1]
+
+        X = [gf_pow(2, -(255 - c)) for c in coef_pos]
+        for i, Xi in enumerate(X):
+            Xi_inv = gf_inverse(Xi)
+            err_loc_prime = 1
+            for j, Xj in enumerate(X):
+                if j != i:
+                    err_loc_prime = gf_mul(err_loc_prime, 1 ^ gf_mul(Xi_inv, Xj))
+            if err_loc_prime == 0:
+                raise ReedSolomonError("Decoding failed: Forney algorithm could not properly detect where the errors are located (errata locator prime is 0).")
+            y = gf_poly_eval(err_eval[::-1], Xi_inv)
+            y = gf_mul(gf_pow(Xi, 1 - self.fcr), y)
+            msg[err_pos[i]] ^= gf_div(y, err_loc_prime)
+
+        if max(self.syndromes(msg)) > 0:
+            raise ReedSolomonError("Could not correct message")
+        return bytes(msg[:self.msg_len])
+
 
 class FuzzyCommitment:
     """
@@ -22,9 +286,14 @@ class FuzzyCommitment:
         """
         self.secret_size = secret_size
         self.parity_bytes = parity_bytes
-        self.rsc = RSCodec(parity_bytes) # n = k + parity
+        self.rsc = SmallRSCodec(parity_bytes, secret_size) # n = k + parity, same codewords as RSCodec(parity_bytes)
         self.codeword_len = secret_size + parity_bytes
 
+    @staticmethod
+    def _xor(a: bytes, b: bytes) -> bytes:
+        # Whole-integer XOR instead of a per-byte loop
+        return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
     def commit(self, biometric_vector: bytes) -> tuple[bytes, bytes]:
         """
         Generates a fresh random secret, commits it to the biometric vector.
@@ -37,17 +306,13 @@ class FuzzyCommitment:
         # 1. Generate Uniformly Random Secret S
         secret = os.urandom(self.secret_size)
         
-        # 2. Encode S -> C
-        codeword = self.rsc.encode(secret) # This appends parity bytes
-        # reedsolo output is bytearray, convert to bytes
-        codeword = bytes(codeword)
+        # 2. Encode S -> C (secret followed by parity bytes)
+        codeword = self.rsc.encode(secret)
         
         # 3. Helper H = C XOR B
-        helper_data = bytearray(len(codeword))
-        for i in range(len(codeword)):
-            helper_data[i] = codeword[i] ^ biometric_vector[i]
+        helper_data = self._xor(codeword, biometric_vector)
             
-        return secret, bytes(helper_data)
+        return secret, helper_data
 
     def unlock(self, biometric_vector: bytes, helper_data: bytes) -> bytes:
         """
@@ -59,16 +324,44 @@ class FuzzyCommitment:
             raise ValueError("Size mismatch")
 
         # 1. Recover Noisy Codeword C' = H XOR B'
-        noisy_codeword = bytearray(len(helper_data))
-        for i in range(len(helper_data)):
-            noisy_codeword[i] = helper_data[i] ^ biometric_vector[i]
+        noisy_codeword = self._xor(helper_data, biometric_vector)
             
         # 2. RS Decode C' -> S
-        try:
-            # decode returns (decoded_msg, decoded_msg_with_ecc, err_list)
-            # we just want the message (secret)
-            decoded_secret, _, _ = self.rsc.decode(noisy_codeword)
-            return bytes(decoded_secret)
-        except ReedSolomonError as e:
-            # Here we could log the failure
-            raise e
+        return self.rsc.decode(noisy_codeword)
+
+    def unlock_many(self, biometric_vectors: Sequence[bytes], helpers: Sequence[bytes]) -> List[Optional[bytes]]:
+        """
+        Batched unlock: entry i recovers the secret from biometric_vectors[i] and helpers[i].
+        Returns: Secret S per entry, or None where correction failed (or sizes mismatch).
+        """
+        if len(biometric_vectors) != len(helpers):
+            raise ValueError("Size mismatch")
+
+        results: List[Optional[bytes]] = [None] * len(helpers)
+        n = self.codeword_len
+        ok = [i for i in range(len(helpers))
+              if len(helpers[i]) == n and len(biometric_vectors[i]) == n]
+        if not ok:
+            return results
+
+        # 1. Recover all Noisy Codewords at once: C' = H XOR B'
+        h = np.frombuffer(b"".join(helpers[i] for i in ok), dtype=np.uint8)
+        b = np.frombuffer(b"".join(biometric_vectors[i] for i in ok), dtype=np.uint8)
+        noisy = (h ^ b).reshape(len(ok), n)
+
+        # 2. RS Decode all C' -> S (clean codewords skip correction entirely)
+        secrets, decoded = self.rsc.decode_many(noisy)
+        for i, secret, success in zip(ok, secrets, decoded.tolist()):
+            if success:
+                results[i] = secret.tobytes()
+        return results
+
+    def unlock_arrays(self, biometric_vectors: np.ndarray, helpers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        unlock_many for (N, n) uint8 arrays (e.g. helper columns of a record store), no bytes objects.
+        biometric_vectors may also be a single (n,) vector, checked against every helper.
+        Returns: (secrets (N, secret_size) uint8, ok (N,) bool)
+        """
+        helpers = np.asarray(helpers, dtype=np.uint8).reshape(-1, self.codeword_len)
+        noisy = helpers ^ np.asarray(biometric_vectors, dtype=np.uint8)
+        return self.rsc.decode_many(noisy)
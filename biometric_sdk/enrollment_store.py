@@ -0,0 +1,72 @@
+import os
+from typing import Iterable
+
+import numpy as np
+
+from record_format import RECORD_DTYPE, RECORD_MAGIC, RECORD_VERSION, pack_records, as_records, records_to_dicts
+
+class EnrollmentStore:
+    """
+    Append-only file of binary enrollment records (record_format rows), memory-mapped for
+    1:N identification (see BioCrypt.identify). A record's id is its row number.
+    Rows are grouped by context_hash through an in-memory index built on first lookup,
+    so a sweep only touches the rows of one service. One writer per file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records = None
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def records(self) -> np.ndarray:
+        """All rows as a read-only RECORD_DTYPE memmap (mapped on first use)."""
+        if self._records is None:
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if size % RECORD_DTYPE.itemsize:
+                raise ValueError(f"{self.path}: length {size} is not a multiple of {RECORD_DTYPE.itemsize}")
+            if size == 0:
+                self._records = np.zeros(0, dtype=RECORD_DTYPE)
+            else:
+                records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r')
+                if not (np.all(records['magic'] == RECORD_MAGIC) and np.all(records['version'] == RECORD_VERSION)):
+                    raise ValueError(f"{self.path}: not a version {RECORD_VERSION} record file")
+                self._records = records
+        return self._records
+
+    def append(self, records: Iterable) -> np.ndarray:
+        """
+        records: enrollment dicts or binary records, or a packed record set.
+        Returns: the new row ids.
+        """
+        data = pack_records(as_records(records))
+        start = len(self)
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        # Remap (and re-index) on next access
+        self._records = None
+        self._index = None
+        return np.arange(start, start + len(data) // RECORD_DTYPE.itemsize)
+
+    def record(self, row: int) -> dict:
+        return records_to_dicts(self.records[row:row + 1])[0]
+
+    def rows_for_context(self, context_hash: bytes) -> np.ndarray:
+        """Row ids (ascending) of the records bound to `context_hash` (32-byte SHA-256 digest)."""
+        if self._index is None:
+            self._build_index()
+        order, keys = self._index
+        key = np.frombuffer(context_hash[:8], dtype='>u8')[0]
+        lo, hi = np.searchsorted(keys, key, side='left'), np.searchsorted(keys, key, side='right')
+        rows = np.sort(order[lo:hi])
+        # The index only sorts on the first 8 bytes; confirm the full hash
+        full = np.frombuffer(context_hash, dtype=np.uint8)
+        return rows[np.all(self.records['context_hash'][rows] == full, axis=1)]
+
+    def _build_index(self):
+        prefixes = np.ascontiguousarray(self.records['context_hash'][:, :8]).view('>u8').ravel()
+        order = np.argsort(prefixes, kind='stable')
+        self._index = (order, prefixes[order])
@@ -1,6 +1,6 @@
 import math
-from typing import List
-from biometric_core import Minutia
+import numpy as np
+from biometric_core import MINUTIA_DTYPE
 
 class GeometricQuantizer:
     """
@@ -21,33 +21,39 @@ class GeometricQuantizer:
         val = (val - offset) % 360
         return int(round(val / self.delta_theta)) % int(360 / self.delta_theta)
 
-    def compute_feature_bytes(self, points: List[Minutia], offset_d: float = 0.0, offset_theta: float = 0.0) -> bytes:
+    def compute_feature_bytes(self, points, offset_d: float = 0.0, offset_theta: float = 0.0) -> bytes:
         """
         Returns feature vector as a byte array (for ECC).
         Each feature is packed into 1 byte (0-255).
+        points: MINUTIA_DTYPE array (e.g. SecureMask anchors) or List[Minutia].
         """
-        if not points:
+        if len(points) == 0:
             return b""
         
+        if isinstance(points, np.ndarray):
+            xs = points['x'].tolist()
+            ys = points['y'].tolist()
+        else:
+            xs = [p.x for p in points]
+            ys = [p.y for p in points]
+        
         # 1. Canonical Sort: Sort by angle relative to centroid to fix order
         # Calculate Centroid
-        cx = sum(p.x for p in points) / len(points)
-        cy = sum(p.y for p in points) / len(points)
+        cx = sum(xs) / len(xs)
+        cy = sum(ys) / len(ys)
         
         # Sort by angle from centroid (0 to 360)
         # atan2(y, x) returns -pi to pi.
-        sorted_points = sorted(points, key=lambda p: math.atan2(p.y - cy, p.x - cx))
+        order = sorted(range(len(xs)), key=lambda i: math.atan2(ys[i] - cy, xs[i] - cx))
         
         byte_list = []
         
-        for i in range(len(sorted_points)):
-            curr = sorted_points[i]
+        for i in order:
             # Star Topology: Feature is relation to Centroid, not neighbor
             # This ensures 1 point noise = 1 byte error (vs 2 in chain)
-            
-            d = curr.distance_to(cx, cy)
-            dx = curr.x - cx
-            dy = curr.y - cy
+            dx = xs[i] - cx
+            dy = ys[i] - cy
+            d = math.sqrt(dx**2 + dy**2)
             rel_angle = math.degrees(math.atan2(dy, dx))
             
             q_d = self.quantize_dist(d, offset_d) & 0x1F  
@@ -58,7 +64,76 @@ class GeometricQuantizer:
             
         return bytes(byte_list)
 
-    def compute_feature_vector(self, points: List[Minutia], offset_d: float = 0.0, offset_theta: float = 0.0) -> str:
+    def compute_feature_bytes_batch(self, anchors: np.ndarray, offset_d=0.0, offset_theta=0.0) -> np.ndarray:
+        """
+        Vectorized compute_feature_bytes for many anchor sets at once.
+        anchors: (N, K, 2) array of (x, y); offset_d / offset_theta: scalars or (N,) arrays.
+        Returns: (N, K) uint8, row i == compute_feature_bytes(anchors[i], offset_d[i], offset_theta[i]).
+        """
+        anchors = np.asarray(anchors, dtype=np.float64)
+        n, k = anchors.shape[:2]
+        off_d = np.broadcast_to(np.asarray(offset_d, dtype=np.float64), (n,))
+        off_t = np.broadcast_to(np.asarray(offset_theta, dtype=np.float64), (n,))
+        if n == 0 or k == 0:
+            return np.zeros((n, k), dtype=np.uint8)
+        
+        xs = anchors[:, :, 0]
+        ys = anchors[:, :, 1]
+        
+        # 1. Centroid, summed left to right like sum() so it rounds identically
+        cx = np.zeros(n)
+        cy = np.zeros(n)
+        for j in range(k):
+            cx = cx + xs[:, j]
+            cy = cy + ys[:, j]
+        cx = (cx / k)[:, None]
+        cy = (cy / k)[:, None]
+        
+        # 2. Canonical Sort by angle from centroid (stable, like sorted())
+        dx = xs - cx
+        dy = ys - cy
+        theta = np.arctan2(dy, dx)
+        order = np.argsort(theta, axis=1, kind='stable')
+        theta = np.take_along_axis(theta, order, axis=1)
+        dx = np.take_along_axis(dx, order, axis=1)
+        dy = np.take_along_axis(dy, order, axis=1)
+        
+        # 3. Star Topology features
+        d = np.sqrt(dx**2 + dy**2)
+        rel_angle = np.degrees(theta)
+        
+        t_d = (d - off_d[:, None]) / self.delta_d
+        q_d = np.round(t_d).astype(np.int64) & 0x1F
+        
+        val = np.mod(rel_angle - off_t[:, None], 360)
+        t_a = val / self.delta_theta
+        q_a = (np.round(t_a).astype(np.int64) % int(360 / self.delta_theta)) & 0x07
+        
+        out = ((q_d << 3) | q_a).astype(np.uint8)
+        
+        # NumPy's atan2/squares may differ from math's by 1 ulp. Rows where that could
+        # change the result (sort near-ties, values at a rounding or wrap boundary)
+        # are recomputed with the scalar function to stay bit-identical.
+        eps = 1e-9
+        # (points repeated across sectors give identical inputs, hence exact and safe ties)
+        same_point = (np.diff(dx, axis=1) == 0) & (np.diff(dy, axis=1) == 0)
+        risky = np.any((np.diff(theta, axis=1) <= eps) & ~same_point, axis=1)
+        risky |= np.any(np.abs(t_d - np.floor(t_d) - 0.5) < eps, axis=1)
+        risky |= np.any(np.abs(t_a - np.floor(t_a) - 0.5) < eps, axis=1)
+        risky |= np.any((val < eps) | (val > 360 - eps), axis=1)
+        for i in np.flatnonzero(risky).tolist():
+            points = np.zeros(k, dtype=MINUTIA_DTYPE)
+            points['x'] = xs[i]
+            points['y'] = ys[i]
+            out[i] = np.frombuffer(self.compute_feature_bytes(points, float(off_d[i]), float(off_t[i])), dtype=np.uint8)
+        return out
+
+    @staticmethod
+    def anchor_tensor(anchor_sets) -> np.ndarray:
+        """Stacks equally sized anchor sets (MINUTIA_DTYPE arrays) into an (N, K, 2) tensor."""
+        return np.stack([np.stack([a['x'], a['y']], axis=-1) for a in anchor_sets]).astype(np.float64)
+
+    def compute_feature_vector(self, points, offset_d: float = 0.0, offset_theta: float = 0.0) -> str:
         # Backward compatibility wrapper (though we should migrate away from this string format)
         b = self.compute_feature_bytes(points, offset_d, offset_theta)
         return "-".join(f"{x:02x}" for x in b)
@@ -0,0 +1,43 @@
+import time
+from typing import List
+
+class StageTrace:
+    """
+    Lap-style stage recorder for the extractor and BioCrypt.
+    mark(stage, **counts) closes the stage that started at the previous mark (or at
+    construction / start()) and stores its wall time plus any counts (pixels, minutiae, ...).
+    One trace per call: marks from concurrent calls would interleave.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.stages: List[dict] = []
+        self._last = time.perf_counter()
+
+    def start(self):
+        """Restarts the lap clock, e.g. after work that should not be attributed to a stage."""
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str, **counts):
+        now = time.perf_counter()
+        self.stages.append({'stage': stage, 'ms': (now - self._last) * 1000, **counts})
+        self._last = now
+
+    @property
+    def total_ms(self) -> float:
+        return sum(s['ms'] for s in self.stages)
+
+    def to_dict(self) -> dict:
+        return {'stages': self.stages, 'total_ms': self.total_ms}
+
+class _NullTrace:
+    """Default trace: every call is a no-op. Check `enabled` before computing costly counts."""
+    enabled = False
+
+    def start(self):
+        pass
+
+    def mark(self, stage: str, **counts):
+        pass
+
+NULL_TRACE = _NullTrace()
@@ -0,0 +1,110 @@
+"""
+Binary enrollment record encoding: one fixed-width, little-endian row per record.
+
+    magic        3 B   b'BLR'
+    version      1 B   RECORD_VERSION
+    helper_ecc   8 B   RS codeword XOR bio vector (secret_size + parity_bytes)
+    context_hash 32 B  SHA-256(service_name)
+    verifier     32 B  SHA-256(secret)
+    offset_d     f64   helper_grid['offset_d']
+    offset_theta f64   helper_grid['offset_theta']
+
+92 bytes per record (the JSON dict is ~250). Record sets are plain concatenations,
+so a file of N records loads with one np.frombuffer call.
+"""
+from typing import Iterable, List, Union
+
+import numpy as np
+
+RECORD_MAGIC = b'BLR'
+RECORD_VERSION = 1
+HELPER_SIZE = 8
+
+RECORD_DTYPE = np.dtype([
+    ('magic', 'S3'),
+    ('version', 'u1'),
+    ('helper_ecc', 'u1', (HELPER_SIZE,)),
+    ('context_hash', 'u1', (32,)),
+    ('verifier', 'u1', (32,)),
+    ('offset_d', '<f8'),
+    ('offset_theta', '<f8'),
+])
+
+BinaryRecord = Union[bytes, bytearray, memoryview]
+
+def _hex_field(record: dict, name: str, size: int) -> bytes:
+    try:
+        raw = bytes.fromhex(record[name])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Record field {name} must be a hex string")
+    if len(raw) != size:
+        raise ValueError(f"Record field {name} must be {size} bytes, got {len(raw)}")
+    return raw
+
+def pack_records(records: Iterable[dict]) -> bytes:
+    """
+    Enrollment record dicts (BioCrypt.enroll output) -> concatenated binary records.
+    Returns: bytes, RECORD_DTYPE.itemsize per record
+    """
+    records = list(records)
+    n = len(records)
+    arr = np.zeros(n, dtype=RECORD_DTYPE)
+    arr['magic'] = RECORD_MAGIC
+    arr['version'] = RECORD_VERSION
+    # Hex fields are joined and decoded in one go per column
+    for name, size in (('helper_ecc', HELPER_SIZE), ('context_hash', 32), ('verifier', 32)):
+        column = b"".join(_hex_field(r, name, size) for r in records)
+        arr[name] = np.frombuffer(column, dtype=np.uint8).reshape(n, size)
+    arr['offset_d'] = [r['helper_grid']['offset_d'] for r in records]
+    arr['offset_theta'] = [r['helper_grid']['offset_theta'] for r in records]
+    return arr.tobytes()
+
+def pack_record(record: dict) -> bytes:
+    return pack_records([record])
+
+def unpack_records(data: BinaryRecord) -> np.ndarray:
+    """
+    Concatenated binary records -> read-only RECORD_DTYPE array (a view on `data`, no copy).
+    Raises ValueError on a truncated buffer, a bad magic or an unknown version.
+    """
+    if len(data) % RECORD_DTYPE.itemsize:
+        raise ValueError(f"Record data length {len(data)} is not a multiple of {RECORD_DTYPE.itemsize}")
+    arr = np.frombuffer(data, dtype=RECORD_DTYPE)
+    if not np.all(arr['magic'] == RECORD_MAGIC):
+        raise ValueError("Not a binary enrollment record (bad magic)")
+    bad = arr['version'] != RECORD_VERSION
+    if np.any(bad):
+        raise ValueError(f"Unsupported record version: {int(arr['version'][bad][0])}")
+    return arr
+
+def records_to_dicts(arr: np.ndarray) -> List[dict]:
+    """RECORD_DTYPE array -> enrollment record dicts, identical to what BioCrypt.enroll returned."""
+    helper = arr['helper_ecc'].tobytes()
+    ctx = arr['context_hash'].tobytes()
+    verifier = arr['verifier'].tobytes()
+    return [{
+        'helper_ecc': helper[i * HELPER_SIZE:(i + 1) * HELPER_SIZE].hex(),
+        'helper_grid': {'offset_d': float(d), 'offset_theta': float(t)},
+        'context_hash': ctx[i * 32:(i + 1) * 32].hex(),
+        'verifier': verifier[i * 32:(i + 1) * 32].hex(),
+    } for i, (d, t) in enumerate(zip(arr['offset_d'].tolist(), arr['offset_theta'].tolist()))]
+
+def unpack_record(data: BinaryRecord) -> dict:
+    """One binary record -> enrollment record dict."""
+    if len(data) != RECORD_DTYPE.itemsize:
+        raise ValueError(f"A binary record is {RECORD_DTYPE.itemsize} bytes, got {len(data)}")
+    return records_to_dicts(unpack_records(data))[0]
+
+def as_record(record: Union[dict, BinaryRecord]) -> dict:
+    """Either record format -> dict (dicts pass through)."""
+    if isinstance(record, (bytes, bytearray, memoryview)):
+        return unpack_record(record)
+    return record
+
+def as_records(records) -> List[dict]:
+    """A list of either format, a packed record set, or a RECORD_DTYPE array -> list of dicts."""
+    if isinstance(records, (bytes, bytearray, memoryview)):
+        return records_to_dicts(unpack_records(records))
+    if isinstance(records, np.ndarray):
+        return records_to_dicts(records)
+    return [as_record(r) for r in records]
@@ -1,9 +1,30 @@
 import hmac
 import hashlib
+import os
 import struct
 import math
+import threading
+from collections import OrderedDict
 from typing import List, Tuple
-from biometric_core import Fingerprint, Minutia
+import numpy as np
+from biometric_core import Fingerprint
+
+# Relative gap below which NumPy and Python float rounding may disagree on an order
+_NEAR_TIE = 1e-12
+
+def _distance_order(xs: np.ndarray, ys: np.ndarray, cx: float, cy: float) -> np.ndarray:
+    """
+    Stable argsort of distances to (cx, cy), identical to sorting by Minutia.distance_to.
+    NumPy's squares can differ from Python's by 1 ulp, so near-ties are re-ranked
+    with the scalar formula.
+    """
+    dist = np.sqrt((xs - cx)**2 + (ys - cy)**2)
+    idx = np.argsort(dist, kind='stable')
+    ranked = dist[idx]
+    if np.any(np.diff(ranked) <= ranked[1:] * _NEAR_TIE):
+        dist = [math.sqrt((x - cx)**2 + (y - cy)**2) for x, y in zip(xs.tolist(), ys.tolist())]
+        idx = np.array(sorted(range(len(dist)), key=dist.__getitem__), dtype=np.intp)
+    return idx
 
 class SecureMask:
     """
@@ -19,6 +40,18 @@ class SecureMask:
         self.mask_seed = hmac.new(self.user_seed, self.service_name, hashlib.sha256).digest()
         self.sectors = self._derive_sectors()
 
+    @classmethod
+    def from_cache(cls, user_seed: bytes, service_name: str, cache: 'SectorCache' = None) -> 'SecureMask':
+        """
+        Same sectors as SecureMask(user_seed, service_name), served from a SectorCache.
+        The returned mask carries only the derived sectors (no seed or mask_seed).
+        """
+        cache = cache if cache is not None else sector_cache
+        mask = cls.__new__(cls)
+        mask.service_name = service_name.encode('utf-8')
+        mask.sectors = list(cache.get(user_seed, service_name))
+        return mask
+
     def _derive_sectors(self) -> List[Tuple[float, float, float, float]]:
         """
         Derives 4 defining rectangles/wedges for search.
@@ -41,26 +74,103 @@ class SecureMask:
             sectors.append( (float(cx), float(cy)) )
         return sectors
 
-    def select_anchors(self, fp: Fingerprint) -> List[Minutia]:
+    def select_anchors(self, fp: Fingerprint) -> np.ndarray:
         """
         Selects 2 anchors per sector (Total 8).
         Criteria: Closest to the deterministic sector center.
+        Returns: MINUTIA_DTYPE rows; fp is not modified.
         """
-        selected_anchors = []
+        points = fp.points
+        xs = points['x']
+        ys = points['y']
+        # Each sector re-sorts the previous sector's order (stable), so distance
+        # ties resolve exactly as successive in-place list sorts used to.
+        order = np.arange(len(points))
+        selected = []
         
         for (cx, cy) in self.sectors:
-            # Find all candidates
-            candidates = fp.minutiae
-            
-            # Sort by distance to sector center
-            candidates.sort(key=lambda m: m.distance_to(cx, cy))
+            # Sort all candidates by distance to sector center
+            order = order[_distance_order(xs[order], ys[order], cx, cy)]
             
             # Pick top 2 unique candidates (Octo-Point System)
             # This provides 8 points total -> 8 features -> 8 bytes for ECC
-            if len(candidates) >= 2:
-                selected_anchors.extend(candidates[:2])
-            else:
-                # Fallback (should rare happen in decent fp)
-                selected_anchors.extend(candidates)
+            # (Fallback: fewer if the fingerprint has < 2 points)
+            selected.append(order[:2])
                 
-        return selected_anchors
+        return points[np.concatenate(selected)]
+
+
+class SectorCache:
+    """
+    Bounded, thread-safe LRU of derived SecureMask sectors per (seed, service).
+    Entries are keyed by a keyed BLAKE2b hash of seed and service (the hash key is
+    random per process), and hold only the sector centres: the seed and the HMAC
+    mask seed are dropped as soon as the sectors are derived.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hash_key = os.urandom(32)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, user_seed: bytes, service_name: str) -> bytes:
+        h = hashlib.blake2b(key=self._hash_key, digest_size=32)
+        h.update(struct.pack('>I', len(user_seed)))
+        h.update(user_seed)
+        h.update(service_name.encode('utf-8'))
+        return h.digest()
+
+    def get(self, user_seed: bytes, service_name: str) -> Tuple[Tuple[float, float], ...]:
+        key = self._key(user_seed, service_name)
+        with self._lock:
+            sectors = self._entries.get(key)
+            if sectors is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return sectors
+            self.misses += 1
+
+        # Derive outside the lock; the temporary mask (and its seed copy) is discarded here
+        sectors = tuple(SecureMask(user_seed, service_name).sectors)
+        if self.maxsize <= 0:
+            return sectors
+
+        with self._lock:
+            self._entries[key] = sectors
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return sectors
+
+    def evict(self, user_seed: bytes, service_name: str) -> bool:
+        """Drops one (seed, service) entry, e.g. after the seed is revoked."""
+        key = self._key(user_seed, service_name)
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self.evictions += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Process-wide default, shared by every BioCrypt instance
+sector_cache = SectorCache()
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from biometric_core import MINUTIA_DTYPE
+
+class TemplateCache:
+    """
+    Content-addressed cache of extracted minutiae (MINUTIA_DTYPE arrays).
+    Keys hash the image content plus the extractor parameters, so a retried upload,
+    a re-run enroll or a benchmark rerun skips the vision pipeline.
+    Tiers: a bounded in-memory LRU, and optionally a directory of .npy files capped at
+    `max_bytes` (least recently used files are deleted first). The directory may be shared by
+    several processes (pool workers get a pickled copy): every write re-measures it, so the
+    cap holds for their combined writes.
+    Cached templates are biometric data: keep `directory` private, and pass a secret
+    `hash_key` so file names cannot be matched against known images.
+    """
+
+    def __init__(self, maxsize: int = 256, directory: str = None, max_bytes: int = 256 * 1024 * 1024,
+                 hash_key: bytes = b""):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._hash_key = hash_key
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_usage())
+
+    def __getstate__(self):
+        # Process-pool workers get the settings and the shared disk tier, not the memory tier
+        state = self.__dict__.copy()
+        state['_entries'] = OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        if self.directory:
+            # The pickled figure is stale by the time a worker unpickles it
+            self._disk_bytes = sum(size for _, size, _ in self._disk_usage())
+
+    def key(self, data, params: dict) -> str:
+        """
+        data: encoded image bytes, or a decoded ndarray (hashed with its shape and dtype).
+        params: extractor parameters that change the output.
+        """
+        h = hashlib.blake2b(key=self._hash_key, digest_size=20)
+        encoded = json.dumps(params, sort_keys=True).encode('utf-8')
+        h.update(struct.pack('>I', len(encoded)))
+        h.update(encoded)
+        if isinstance(data, np.ndarray):
+            h.update(f"ndarray:{data.dtype.str}:{data.shape}".encode('ascii'))
+            h.update(np.ascontiguousarray(data).data)
+        else:
+            h.update(b"bytes:")
+            h.update(data)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Returns a copy of the cached minutiae, or None."""
+        with self._lock:
+            points = self._entries.get(key)
+            if points is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return points.copy()
+
+        points = self._disk_get(key)
+        with self._lock:
+            if points is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, points)
+        return points.copy()
+
+    def put(self, key: str, points: np.ndarray):
+        points = np.array(points, dtype=MINUTIA_DTYPE)
+        with self._lock:
+            self._remember(key, points)
+        if self.directory:
+            self._disk_put(key, points)
+
+    def clear(self):
+        """Empties both tiers."""
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+        if self.directory:
+            for path in self._disk_files():
+                self._unlink(path)
+
+    def stats(self) -> dict:
+        if self.directory:
+            disk_bytes = sum(size for _, size, _ in self._disk_usage()) # Includes other processes' writes
+            with self._lock:
+                self._disk_bytes = disk_bytes
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_evictions': self.disk_evictions,
+                'disk_bytes': self._disk_bytes,
+                'max_bytes': self.max_bytes if self.directory else 0,
+            }
+
+    # --- memory tier (call with the lock held) ---
+
+    def _remember(self, key: str, points: np.ndarray):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = points
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # --- disk tier ---
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.npy')
+
+    def _disk_files(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.npy')]
+
+    def _disk_usage(self) -> list:
+        """(mtime, size, path) of every cached file. Other processes write here too, so this is the only true total."""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.npy'):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue # Evicted by another process meanwhile
+                files.append((st.st_mtime, st.st_size, entry.path))
+        return files
+
+    def _disk_get(self, key: str) -> Optional[np.ndarray]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            points = np.load(path, allow_pickle=False)
+            os.utime(path) # mtime doubles as the LRU clock
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError):
+            self._unlink(path) # Truncated / foreign file: treat as a miss
+            return None
+        if points.dtype != MINUTIA_DTYPE:
+            self._unlink(path)
+            return None
+        return points
+
+    def _disk_put(self, key: str, points: np.ndarray):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, points, allow_pickle=False)
+        os.replace(tmp, path)
+        # Measure the directory, not our own running count: it misses other processes' writes
+        files = self._disk_usage()
+        with self._lock:
+            self._disk_bytes = sum(size for _, size, _ in files)
+            over = self._disk_bytes > self.max_bytes
+        if over:
+            self._disk_evict(files, keep=path)
+
+    def _disk_evict(self, files: list, keep: str):
+        # Trim to 90% of the cap, so a full cache does not evict on every put
+        target = int(self.max_bytes * 0.9)
+        for _, _, path in sorted(files):
+            with self._lock:
+                if self._disk_bytes <= target:
+                    return
+            if path != keep and self._unlink(path):
+                with self._lock:
+                    self.disk_evictions += 1
+
+    def _unlink(self, path: str) -> bool:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return False
+        with self._lock:
+            self._disk_bytes -= size
+        return True
@@ -1,13 +1,11 @@
-import { exec } from "child_process";
+import { spawn, ChildProcessWithoutNullStreams } from "child_process";
 import path from "path";
-import fs from "fs";
-import { promisify } from "util";
-
-const execAsync = promisify(exec);
+import readline from "readline";
 
 // Path to the Python SDK wrapper
 const SDK_PATH = path.resolve(process.cwd(), "biometric_sdk", "cli_wrapper.py");
 const PYTHON_CMD = "python"; // Assume python is in PATH
+const REQUEST_TIMEOUT_MS = 30_000;
 
 export interface BiometricRecord {
     helper_ecc: string;
@@ -28,30 +26,140 @@ export interface VerifyResult {
     error?: string;
 }
 
+interface PendingRequest {
+    resolve: (value: any) => void;
+    reject: (reason: Error) => void;
+    timer: NodeJS.Timeout;
+}
+
+/**
+ * Long-running `cli_wrapper.py --action serve` process.
+ * Python startup and the cv2/numpy/skimage imports are paid once instead of per request.
+ * Requests are newline-delimited JSON, matched to responses by `id`.
+ */
+class BiometricWorker {
+    private proc: ChildProcessWithoutNullStreams | null = null;
+    private pending = new Map<number, PendingRequest>();
+    private nextId = 1;
+
+    private start(): ChildProcessWithoutNullStreams {
+        const proc = spawn(PYTHON_CMD, [SDK_PATH, "--action", "serve"]);
+
+        readline.createInterface({ input: proc.stdout }).on("line", (line) => {
+            let response: any;
+            try {
+                response = JSON.parse(line);
+            } catch {
+                console.warn("Biometric SDK Warning: unexpected output:", line);
+                return;
+            }
+            const request = this.pending.get(response.id);
+            if (!request) return;
+            this.pending.delete(response.id);
+            clearTimeout(request.timer);
+            delete response.id;
+            request.resolve(response);
+        });
+
+        proc.stderr.on("data", (data) => {
+            // Python often prints warnings to stderr, so we don't fail on it
+            console.warn("Biometric SDK Warning:", data.toString());
+        });
+
+        proc.on("exit", (code) => {
+            this.fail(proc, new Error(`Biometric worker exited (code ${code})`));
+        });
+
+        proc.on("error", (error) => {
+            console.error("Biometric worker error:", error);
+            this.fail(proc, error);
+        });
+
+        // e.g. EPIPE when the worker died between requests
+        proc.stdin.on("error", (error) => this.fail(proc, error));
+
+        this.proc = proc;
+        return proc;
+    }
+
+    /**
+     * Fail in-flight requests; the next call spawns a fresh worker.
+     */
+    private fail(proc: ChildProcessWithoutNullStreams, error: Error) {
+        if (this.proc !== proc) return;
+        this.proc = null;
+        for (const [id, request] of Array.from(this.pending.entries())) {
+            clearTimeout(request.timer);
+            request.reject(error);
+            this.pending.delete(id);
+        }
+    }
+
+    request<T>(payload: Record<string, unknown>): Promise<T> {
+        const proc = this.proc ?? this.start();
+        const id = this.nextId++;
+
+        return new Promise<T>((resolve, reject) => {
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                reject(new Error("Biometric worker timed out"));
+            }, REQUEST_TIMEOUT_MS);
+
+            this.pending.set(id, { resolve, reject, timer });
+            proc.stdin.write(JSON.stringify({ ...payload, id }) + "\n");
+        });
+    }
+
+    /**
+     * Spawns the worker (if needed) and runs one pass of the whole pipeline,
+     * so the first login does not pay library initialisation.
+     */
+    warmUp(): Promise<{ success: boolean; error?: string }> {
+        return this.request({ action: "warmup" });
+    }
+}
+
+const worker = new BiometricWorker();
+
+/**
+ * A path is read by the worker; a Buffer (e.g. the upload body) is sent inline,
+ * so no temp file is needed.
+ */
+function imageField(image: string | Buffer): Record<string, string> {
+    return Buffer.isBuffer(image) ? { image_b64: image.toString("base64") } : { image };
+}
+
 export const biometricService = {
+    /**
+     * Start the Python worker ahead of the first enroll/verify call.
+     */
+    async warmUp(): Promise<boolean> {
+        try {
+            const result = await worker.warmUp();
+            return result.success;
+        } catch (error: any) {
+            console.error("Biometric Warm-up Failed:", error);
+            return false;
+        }
+    },
+
     /**
      * Enroll a user using a biometric image.
-     * @param imagePath Path to the temporary image file uploaded by the user
+     * @param image Path to the uploaded image, or its raw bytes
      * @param userId User's ID or unique identifier for context binding
      */
-    async enroll(imagePath: string, userId: string): Promise<EnrollResult> {
+    async enroll(image: string | Buffer, userId: string): Promise<EnrollResult> {
         try {
             // Create a unique service context per user to prevent cross-user replay attacks
             // In a real app, this might just be the app name "SehatiApp" if keys are global,
             // but binding to UserID makes the key unique to THIS user account.
             const serviceName = `SehatiApp`;
 
-            const command = `${PYTHON_CMD} "${SDK_PATH}" --action enroll --image "${imagePath}" --service "${serviceName}"`;
-
-            const { stdout, stderr } = await execAsync(command);
-
-            if (stderr && !stderr.startsWith("Import Error")) {
-                // Python often prints warnings to stderr, so we don't always fail on it
-                console.warn("Biometric SDK Warning:", stderr);
-            }
-
-            const result = JSON.parse(stdout.trim());
-            return result;
+            return await worker.request<EnrollResult>({
+                action: "enroll",
+                ...imageField(image),
+                service: serviceName,
+            });
 
         } catch (error: any) {
             console.error("Biometric Enrollment Failed:", error);
@@ -61,22 +169,20 @@ export const biometricService = {
 
     /**
      * Verify a user and derive their key.
-     * @param imagePath Path to the temporary image file
+     * @param image Path to the image, or its raw bytes
      * @param userId User's ID
      * @param record The stored enrollment record (JSON object)
      */
-    async verify(imagePath: string, record: BiometricRecord): Promise<VerifyResult> {
+    async verify(image: string | Buffer, record: BiometricRecord): Promise<VerifyResult> {
         try {
             const serviceName = `SehatiApp`;
-            // Escape the JSON string carefully for command line
-            const recordStr = JSON.stringify(record).replace(/"/g, '\\"');
-
-            const command = `${PYTHON_CMD} "${SDK_PATH}" --action verify --image "${imagePath}" --service "${serviceName}" --record "${recordStr}"`;
-
-            const { stdout, stderr } = await execAsync(command);
 
-            const result = JSON.parse(stdout.trim());
-            return result;
+            return await worker.request<VerifyResult>({
+                action: "verify",
+                ...imageField(image),
+                service: serviceName,
+                record,
+            });
 
         } catch (error: any) {
             console.error("Biometric Verification Failed:", error);